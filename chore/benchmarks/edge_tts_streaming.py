@@ -0,0 +1,108 @@
+"""Compares the time until the first EdgeTTS audio can be played: saving the mp3 file and decoding it vs. streaming and decoding it in memory.
+
+Starts a local websocket stand-in for the EdgeTTS service that sends a generated mp3 in the same message format,
+at 5x real time (roughly what the real service does), and checks that the streamed audio equals the decoded file.
+
+Run from the repository root: python -m chore.benchmarks.edge_tts_streaming
+"""
+import asyncio
+import io
+import os
+import tempfile
+import time
+from aiohttp import web, WSMsgType
+import edge_tts
+import edge_tts.communicate
+import numpy
+import soundfile
+from services.edge import EdgeTTS
+from services.mp3_stream_decoder import BITRATES
+
+SAMPLERATE = 24000
+SPEED = 5  # times real time
+MESSAGE_BYTES = 4096
+DURATIONS = [2, 5, 15]
+
+
+def create_mp3(seconds: float) -> bytes:
+    t = numpy.arange(int(SAMPLERATE * seconds)) / SAMPLERATE
+    audio = 0.3 * numpy.sin(2 * numpy.pi * 220 * t) * numpy.sin(numpy.pi * 3 * t) ** 2
+    mp3 = io.BytesIO()
+    # 48 kbit/s constant, like the service sends it
+    soundfile.write(
+        mp3, audio.astype("float32"), SAMPLERATE, format="MP3", bitrate_mode="CONSTANT", compression_level=0.75
+    )
+    data = mp3.getvalue()
+    # the real service doesn't send the Info frame at the start, so skip it
+    bitrate = BITRATES[False][data[2] >> 4] * 1000
+    return data[72 * bitrate // SAMPLERATE + (data[2] >> 1 & 1) :]
+
+
+def message(path: str, body: bytes = b"") -> bytes:
+    header = f"X-RequestId:benchmark\r\nContent-Type:audio/mpeg\r\nPath:{path}\r\n".encode()
+    return len(header).to_bytes(2, "big") + header + body
+
+
+async def serve(mp3: bytes) -> web.AppRunner:
+    async def handle(request):
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        async for received in websocket:
+            if received.type == WSMsgType.TEXT and "Path:ssml" in received.data:
+                await websocket.send_str("X-RequestId:benchmark\r\nPath:turn.start\r\n\r\n{}")
+                for start in range(0, len(mp3), MESSAGE_BYTES):
+                    await asyncio.sleep(MESSAGE_BYTES / len(mp3) * DURATION / SPEED)
+                    await websocket.send_bytes(message("audio", mp3[start : start + MESSAGE_BYTES]))
+                await websocket.send_str("X-RequestId:benchmark\r\nPath:turn.end\r\n\r\n{}")
+        return websocket
+
+    app = web.Application()
+    app.router.add_get("/tts", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 8765).start()
+    return runner
+
+
+async def run_file(file_path: str) -> tuple[float, numpy.ndarray]:
+    """The old way: save the whole mp3 to a file, then decode it."""
+    start = time.perf_counter()
+    await edge_tts.Communicate("benchmark", "en-US-GuyNeural").save(file_path)
+    audio, _samplerate = soundfile.read(file_path, dtype="float32")
+    return time.perf_counter() - start, audio
+
+
+async def run_stream(edge: EdgeTTS) -> tuple[float, float, numpy.ndarray]:
+    start = time.perf_counter()
+    first_chunk = None
+    chunks = []
+    async for chunk, _samplerate in edge.stream_speech("benchmark"):
+        if first_chunk is None:
+            first_chunk = time.perf_counter() - start
+        chunks.append(chunk)
+    return first_chunk, time.perf_counter() - start, numpy.concatenate(chunks)
+
+
+async def main():
+    global DURATION  # pylint: disable=global-statement
+    edge_tts.communicate.WSS_URL = "ws://127.0.0.1:8765/tts?benchmark=1"
+    app_root_dir = tempfile.mkdtemp()
+    edge = EdgeTTS(app_root_dir)
+    file_path = os.path.join(app_root_dir, "edge_tts.mp3")
+
+    for DURATION in DURATIONS:
+        runner = await serve(create_mp3(DURATION))
+        file_time, file_audio = await run_file(file_path)
+        first_chunk, stream_time, stream_audio = await run_stream(edge)
+        await runner.cleanup()
+
+        difference = numpy.abs(stream_audio - file_audio[: len(stream_audio)]).max()
+        print(
+            f"{DURATION:>3}s speech   file: first audio after {file_time * 1000:6.0f}ms"
+            f" | stream: first audio after {first_chunk * 1000:4.0f}ms (all after {stream_time * 1000:6.0f}ms)"
+            f" | {len(stream_audio)}/{len(file_audio)} samples, max difference {difference:.1e}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
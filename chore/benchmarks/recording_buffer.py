@@ -0,0 +1,53 @@
+"""Compares the per-callback cost of the RecordingBuffer with the former numpy.concatenate approach.
+
+Run from the repository root: python -m chore.benchmarks.recording_buffer
+"""
+import time
+import numpy
+from services.audio_buffer import RecordingBuffer
+
+SAMPLERATE = 44100
+CALLBACK_FRAMES = 441  # ~10ms, similar to what sounddevice delivers by default
+DURATIONS = [5, 30, 120]
+
+
+def run_concatenate(callbacks: int, indata: numpy.ndarray) -> list[float]:
+    timings = []
+    recording = None
+    for _ in range(callbacks):
+        start = time.perf_counter()
+        if recording is None:
+            recording = indata.copy()
+        else:
+            recording = numpy.concatenate((recording, indata.copy()))
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def run_recording_buffer(callbacks: int, indata: numpy.ndarray) -> list[float]:
+    timings = []
+    buffer = RecordingBuffer(SAMPLERATE)
+    for _ in range(callbacks):
+        start = time.perf_counter()
+        buffer.append(indata)
+        timings.append(time.perf_counter() - start)
+    buffer.get_audio()
+    return timings
+
+
+def describe(timings: list[float]) -> str:
+    micros = numpy.array(timings) * 1e6
+    quarter = len(micros) // 4
+    return (
+        f"mean {micros.mean():8.1f}µs | first quarter {micros[:quarter].mean():8.1f}µs"
+        f" | last quarter {micros[-quarter:].mean():8.1f}µs | max {micros.max():9.1f}µs"
+    )
+
+
+if __name__ == "__main__":
+    indata = numpy.random.uniform(-1, 1, (CALLBACK_FRAMES, 1)).astype("float32")
+    for seconds in DURATIONS:
+        callbacks = seconds * SAMPLERATE // CALLBACK_FRAMES
+        print(f"{seconds:>4}s recording ({callbacks} callbacks)")
+        print(f"   RecordingBuffer     {describe(run_recording_buffer(callbacks, indata))}")
+        print(f"   numpy.concatenate   {describe(run_concatenate(callbacks, indata))}")
@@ -0,0 +1,40 @@
+"""Compares the polyphase resampler with the former FFT resampling (scipy.signal.resample).
+
+Run from the repository root: python -m chore.benchmarks.resampler
+"""
+import time
+import numpy
+from scipy.signal import resample as fft_resample
+from services.resampler import resample
+
+RATE_PAIRS = [(24000, 44100), (44100, 48000), (44100, 16000)]
+DURATIONS = [1, 10, 60]
+RUNS = 3
+
+
+def measure(function) -> float:
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+if __name__ == "__main__":
+    for source_rate, target_rate in RATE_PAIRS:
+        print(f"{source_rate} Hz -> {target_rate} Hz")
+        for seconds in DURATIONS:
+            # TTS output has arbitrary lengths, which are much harder for the FFT than round ones
+            for label, length in [
+                ("round length", source_rate * seconds),
+                ("odd length", source_rate * seconds + 1237),
+            ]:
+                audio = numpy.random.uniform(-1, 1, length).astype("float32")
+                target_length = int(round(len(audio) * target_rate / source_rate))
+
+                polyphase = measure(lambda: resample(audio, source_rate, target_rate))
+                fft = measure(lambda: fft_resample(audio, target_length))
+                print(
+                    f"   {seconds:>3}s {label:<12}   polyphase {polyphase:8.1f}ms | FFT {fft:8.1f}ms"
+                )
@@ -0,0 +1,97 @@
+"""Compares the release-to-transcript latency of a single transcription with the streaming transcription.
+
+Starts a local stand-in for the Whisper endpoint that takes 300ms plus 100ms per 10 KB of uploaded audio,
+"speaks" a recording with three sentences in real time and measures how long it takes after the
+"push-to-talk" key is released until the transcript is available.
+
+Run from the repository root: python -m chore.benchmarks.streaming_transcription
+"""
+import json
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy
+from services.audio_recorder import AudioRecorder
+from services.open_ai import OpenAi
+from services.streaming_transcription import StreamingTranscription
+from services.voice_activity import VoiceActivitySegmenter
+
+SAMPLERATE = 44100
+CALLBACK_FRAMES = 441
+FEATURES = {"features": {"stt_upload_format": "flac", "trim_silence": True}}
+
+
+class StandInWhisperHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(0.3 + len(body) / 10240 * 0.1)
+        response = json.dumps({"text": f"{len(body)} bytes"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+def create_recording() -> numpy.ndarray:
+    def silence(seconds):
+        return numpy.random.normal(0, 0.0005, (int(SAMPLERATE * seconds), 1))
+
+    def speech(seconds):
+        t = numpy.arange(int(SAMPLERATE * seconds)) / SAMPLERATE
+        return (0.2 * numpy.sin(2 * numpy.pi * 220 * t) * numpy.sin(numpy.pi * 3 * t) ** 2)[:, None]
+
+    parts = [silence(0.3), speech(2.5), silence(0.8), speech(2.5), silence(0.8), speech(2.0), silence(0.2)]
+    return numpy.concatenate(parts).astype("float32")
+
+
+def run_single(recorder: AudioRecorder, openai: OpenAi, recording: numpy.ndarray) -> float:
+    for start in range(0, len(recording), CALLBACK_FRAMES):
+        time.sleep(CALLBACK_FRAMES / SAMPLERATE)  # "speaking"
+
+    released = time.perf_counter()
+    openai.transcribe(recorder.finalize_recording(recording, FEATURES))
+    return time.perf_counter() - released
+
+
+def run_streaming(recorder: AudioRecorder, openai: OpenAi, recording: numpy.ndarray) -> float:
+    transcription = StreamingTranscription(openai.transcribe)
+    segmenter = VoiceActivitySegmenter(SAMPLERATE, threshold_db=-45, hangover_ms=500, min_speech_ms=100)
+
+    def add_segments(segments):
+        for segment in segments:
+            transcription.add_segment(recorder.finalize_recording(segment, FEATURES))
+
+    for start in range(0, len(recording), CALLBACK_FRAMES):
+        time.sleep(CALLBACK_FRAMES / SAMPLERATE)  # "speaking"
+        add_segments(segmenter.process(recording[start : start + CALLBACK_FRAMES]))
+
+    released = time.perf_counter()
+    last_segment = segmenter.flush()
+    if last_segment is not None:
+        add_segments([last_segment])
+    transcription.result()
+    return time.perf_counter() - released
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInWhisperHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    openai = OpenAi("stand-in", base_url=f"http://127.0.0.1:{server.server_port}/v1")
+    recording = create_recording()
+
+    # the recorder is only used to encode the recordings, so we don't need its input stream
+    recorder = AudioRecorder.__new__(AudioRecorder)
+    recorder.samplerate = SAMPLERATE
+    recorder.file_dir = tempfile.gettempdir()
+
+    print(f"Recording: {len(recording) / SAMPLERATE:.1f}s, three sentences")
+    print(f"   single transcription:    {run_single(recorder, openai, recording) * 1000:6.0f}ms after release")
+    print(f"   streaming transcription: {run_streaming(recorder, openai, recording) * 1000:6.0f}ms after release")
+
+    server.shutdown()
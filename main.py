@@ -1,9 +1,14 @@
+from concurrent.futures import Future, ThreadPoolExecutor
 from os import path
 import sys
-import asyncio
-import threading
+import time
+from typing import BinaryIO
 from pynput import keyboard
+from services.audio_mixer import AudioMixer
 from services.audio_recorder import AudioRecorder
+from services.pipeline_worker import PipelineWorker
+from services.streaming_transcription import StreamingTranscription
+from services.voice_activity import VoiceActivitySegmenter
 from services.secret_keeper import SecretKeeper
 from services.tower import Tower
 from services.printr import Printr
@@ -34,9 +39,20 @@ class WingmanAI:
         self.config_manager = ConfigManager(self.app_root_dir, self.app_is_bundled)
         self.secret_keeper = SecretKeeper(self.app_root_dir)
         self.audio_recorder = AudioRecorder(self.app_root_dir)
+        # the only owner of the audio output, shared by all wingmen so they don't cut each other off
+        self.audio_mixer = AudioMixer()
+        self.pipeline = PipelineWorker()
+
+        # starts, stops and encodes the recordings in order, off the keyboard listener thread
+        self.recording_worker = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="recording"
+        )
+        self.streaming_transcription: StreamingTranscription | None = None
+        self.callback_durations: dict[str, float] = {}
+        """The longest duration (in seconds) of each keyboard listener callback so far."""
 
     def load_context(self, context=""):
-        self.active = False
+        self.deactivate()
         try:
             if self.config_manager:
                 config = self.config_manager.get_context_config(context)
@@ -44,6 +60,7 @@ class WingmanAI:
                     config=config,
                     secret_keeper=self.secret_keeper,
                     app_root_dir=self.app_root_dir,
+                    audio_mixer=self.audio_mixer,
                 )
 
         except FileNotFoundError:
@@ -55,37 +72,127 @@ class WingmanAI:
     def activate(self):
         if self.tower:
             self.active = True
+            config = self.tower.get_config()
+            self.audio_recorder.set_preroll(
+                config.get("features", {}).get("preroll_ms", 0)
+            )
+            self.__start_voice_activation(config.get("voice_activation", {}))
 
     def deactivate(self):
         self.active = False
+        self.audio_recorder.set_preroll(0)
+        self.audio_recorder.stop_voice_activation()
+
+    def __start_voice_activation(self, settings: dict):
+        if not settings.get("enabled", False):
+            return
+
+        wingman_name = settings.get("wingman")
+        wingman = (
+            self.tower.get_wingman_by_name(wingman_name)
+            if wingman_name
+            else next(iter(self.tower.get_wingmen()), None)
+        )
+        if not wingman:
+            printr.print_warn(
+                f"Voice activation is enabled but there is no runnable Wingman named '{wingman_name}'."
+            )
+            return
+
+        segmenter = VoiceActivitySegmenter(
+            samplerate=self.audio_recorder.samplerate,
+            channels=self.audio_recorder.channels,
+            threshold_db=settings.get("threshold_db", -40),
+            hangover_ms=settings.get("hangover_ms", 800),
+            min_speech_ms=settings.get("min_speech_ms", 300),
+            max_utterance_seconds=settings.get("max_utterance_seconds", 30),
+        )
+
+        def on_utterance(recording):
+            recorded_audio = self.audio_recorder.finalize_recording(
+                recording, wingman.config
+            )
+            if recorded_audio:
+                self.process_recording(wingman, recorded_audio)
+
+        self.audio_recorder.start_voice_activation(segmenter, on_utterance)
+        printr.print(f"Voice activation is listening for {wingman.name}.", tags="info")
 
     def on_press(self, key):
+        # runs on the keyboard listener thread, so only enqueue work here - see on_release()
+        callback_start = time.perf_counter()
         if self.active and self.tower and self.active_recording["key"] == "":
             wingman = self.tower.get_wingman_from_key(key)
             if wingman:
                 self.active_recording = dict(key=key, wingman=wingman)
-                self.audio_recorder.start_recording()
+                self.recording_worker.submit(
+                    self.__start_recording, wingman
+                ).add_done_callback(self.__report_recording_error)
+                self.__track_callback_duration("on_press", callback_start, wingman)
 
     def on_release(self, key):
+        # Runs on the keyboard listener thread. Everything that takes time (stopping the stream, encoding the recording...)
+        # is done by the recording worker, so that key events don't queue up behind it.
+        callback_start = time.perf_counter()
         if self.active and self.active_recording["key"] == key:
             wingman = self.active_recording["wingman"]
-            recorded_audio_wav = self.audio_recorder.stop_recording()
             self.active_recording = dict(key="", wingman=None)
-
-            def run_async_process():
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                try:
-                    if isinstance(wingman, Wingman):
-                        loop.run_until_complete(
-                            wingman.process(str(recorded_audio_wav))
-                        )
-                finally:
-                    loop.close()
-
-            if recorded_audio_wav:
-                play_thread = threading.Thread(target=run_async_process)
-                play_thread.start()
+            self.recording_worker.submit(
+                self.__stop_recording, wingman
+            ).add_done_callback(self.__report_recording_error)
+            self.__track_callback_duration("on_release", callback_start, wingman)
+
+    def __track_callback_duration(
+        self, callback_name: str, callback_start: float, wingman: Wingman
+    ):
+        """Records how long a keyboard listener callback took, up to now. In debug mode, the duration is printed as well.
+        Printing writes to the GUI, so it's handed to the recording worker and not part of the measured duration."""
+        duration = time.perf_counter() - callback_start
+        self.callback_durations[callback_name] = max(
+            duration, self.callback_durations.get(callback_name, 0)
+        )
+        if wingman.debug:
+            self.recording_worker.submit(
+                printr.print,
+                f"   {callback_name} took {duration * 1000:.3f}ms (max: {self.callback_durations[callback_name] * 1000:.3f}ms)",
+                tags="info",
+            )
+
+    def __report_recording_error(self, future: Future):
+        error = future.exception()
+        if error:
+            printr.print_err(f"Recording failed: {error}", wait_for_gui=False)
+
+    def __start_recording(self, wingman: Wingman):
+        transcription = wingman.start_streaming_transcription()
+        self.streaming_transcription = transcription
+
+        def add_segment(recording):
+            segment = self.audio_recorder.finalize_recording(
+                recording, wingman.config
+            )
+            if segment:
+                transcription.add_segment(segment)
+
+        self.audio_recorder.start_recording(
+            wingman.config, add_segment if transcription else None
+        )
+
+    def __stop_recording(self, wingman: Wingman):
+        transcription = self.streaming_transcription
+        self.streaming_transcription = None
+        recorded_audio = self.audio_recorder.stop_recording(wingman.config)
+
+        if transcription and transcription.has_segments():
+            self.process_recording(wingman, transcription)
+        elif recorded_audio:
+            self.process_recording(wingman, recorded_audio)
+
+    def process_recording(
+        self, wingman: Wingman, recorded_audio: BinaryIO | StreamingTranscription
+    ):
+        if isinstance(wingman, Wingman):
+            self.pipeline.submit(wingman.process(recorded_audio))
 
 
 # ─────────────────────────────────── ↓ START ↓ ─────────────────────────────────────────
@@ -0,0 +1,149 @@
+import numpy
+
+
+class RecordingBuffer:
+    """Collects audio frames from the input stream in fixed-size, preallocated blocks.
+
+    Appending only copies the incoming frames into the current block, so the cost per
+    input stream callback does not depend on how long the recording already is.
+    The final array is assembled exactly once in `get_audio()`.
+    """
+
+    def __init__(
+        self,
+        samplerate: int,
+        channels: int = 1,
+        block_seconds: float = 1.0,
+        preallocated_seconds: float = 10.0,
+        dtype: str = "float32",
+    ):
+        self.channels = channels
+        self.dtype = dtype
+        self.block_frames = max(1, int(samplerate * block_seconds))
+
+        self.blocks: list[numpy.ndarray] = []
+        """The blocks of the current recording. Only the last one may be partially filled."""
+
+        self.block_offset = self.block_frames
+        """The number of frames written to the last block."""
+
+        # Blocks are recycled between recordings so that the input stream callback
+        # doesn't have to allocate memory for the usual, short push-to-talk recording.
+        self.max_spare_blocks = max(1, int(preallocated_seconds / block_seconds))
+        self.spare_blocks: list[numpy.ndarray] = [
+            self.__new_block() for _ in range(self.max_spare_blocks)
+        ]
+
+    def __len__(self) -> int:
+        if not self.blocks:
+            return 0
+        return (len(self.blocks) - 1) * self.block_frames + self.block_offset
+
+    def __new_block(self) -> numpy.ndarray:
+        return numpy.empty((self.block_frames, self.channels), dtype=self.dtype)
+
+    def append(self, data: numpy.ndarray):
+        """Copies the given frames (shape: frames x channels) into the buffer."""
+        position = 0
+        remaining = len(data)
+        while remaining > 0:
+            if self.block_offset == self.block_frames:
+                self.blocks.append(
+                    self.spare_blocks.pop() if self.spare_blocks else self.__new_block()
+                )
+                self.block_offset = 0
+
+            count = min(remaining, self.block_frames - self.block_offset)
+            self.blocks[-1][self.block_offset : self.block_offset + count] = data[
+                position : position + count
+            ]
+            self.block_offset += count
+            position += count
+            remaining -= count
+
+    def get_audio(self) -> numpy.ndarray | None:
+        """Assembles the recorded frames into a single contiguous array and resets the buffer.
+
+        Returns:
+            numpy.ndarray | None: The recording (shape: frames x channels) or None if nothing was recorded.
+        """
+        frame_count = len(self)
+        if frame_count == 0:
+            self.clear()
+            return None
+
+        audio = numpy.empty((frame_count, self.channels), dtype=self.dtype)
+        for index, block in enumerate(self.blocks):
+            start = index * self.block_frames
+            end = min(start + self.block_frames, frame_count)
+            audio[start:end] = block[: end - start]
+
+        self.clear()
+        return audio
+
+    def clear(self):
+        """Drops the recorded frames and keeps the blocks for the next recording."""
+        self.spare_blocks.extend(
+            self.blocks[: max(0, self.max_spare_blocks - len(self.spare_blocks))]
+        )
+        self.blocks = []
+        self.block_offset = self.block_frames
+
+
+class RingBuffer:
+    """A bounded circular buffer that always holds the most recent frames of the input stream.
+
+    Used as "pre-roll" so that audio captured right before a recording was started
+    can be prepended to it. Memory usage is fixed by `capacity_seconds`.
+    """
+
+    def __init__(
+        self,
+        samplerate: int,
+        channels: int = 1,
+        capacity_seconds: float = 0.3,
+        dtype: str = "float32",
+    ):
+        self.capacity = max(1, int(samplerate * capacity_seconds))
+        self.buffer = numpy.zeros((self.capacity, channels), dtype=dtype)
+
+        self.write_position = 0
+        """The index in `buffer` where the next frame will be written."""
+
+        self.size = 0
+        """The number of valid frames in the buffer (never more than `capacity`)."""
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, data: numpy.ndarray):
+        """Writes the given frames (shape: frames x channels), overwriting the oldest ones."""
+        if len(data) >= self.capacity:
+            self.buffer[:] = data[-self.capacity :]
+            self.write_position = 0
+            self.size = self.capacity
+            return
+
+        end = self.write_position + len(data)
+        if end <= self.capacity:
+            self.buffer[self.write_position : end] = data
+        else:
+            split = self.capacity - self.write_position
+            self.buffer[self.write_position :] = data[:split]
+            self.buffer[: end - self.capacity] = data[split:]
+
+        self.write_position = end % self.capacity
+        self.size = min(self.capacity, self.size + len(data))
+
+    def read(self) -> numpy.ndarray:
+        """Returns a copy of the buffered frames in chronological order."""
+        start = (self.write_position - self.size) % self.capacity
+        if start + self.size <= self.capacity:
+            return self.buffer[start : start + self.size].copy()
+        return numpy.concatenate(
+            (self.buffer[start:], self.buffer[: self.write_position])
+        )
+
+    def clear(self):
+        self.write_position = 0
+        self.size = 0
@@ -0,0 +1,242 @@
+from collections import deque
+from concurrent.futures import Future
+import threading
+import time
+import numpy as np
+from pedalboard.io import StreamResampler
+import sounddevice as sd
+
+
+class AudioPlayback:
+    """One response that is played while it's still being written.
+
+    Write mono float32 chunks as they arrive and call finish() after the last one.
+    The mixer starts the output as soon as the first chunk is there.
+    """
+
+    def __init__(self, source: str, samplerate: int, output_samplerate: int):
+        self.source = source
+        self.samplerate = samplerate
+        self.resampler = (
+            StreamResampler(samplerate, output_samplerate, 1)
+            if samplerate != output_samplerate
+            else None
+        )
+        self.chunks: deque[np.ndarray] = deque()
+        self.chunk_offset = 0
+        """How many frames of the first chunk were played already."""
+        self.finished = False
+        self.stopped = False
+        self.done = threading.Event()
+        self.started = threading.Event()
+        """Set once the first sample was handed to the audio device."""
+        self.future: Future = Future()
+        """Resolves once the playback was played completely or stopped. Its callbacks run in the audio thread, so keep them short."""
+
+        self.start_time = time.perf_counter()
+        self.first_sample_time: float | None = None
+        self.underruns = 0
+        """How often the device wanted audio but the next chunk hadn't arrived yet."""
+
+    @property
+    def time_to_first_sample(self) -> float | None:
+        """Seconds from the start of the playback until its first sample was handed to the audio device.
+        This includes the time it waited for the playbacks queued before it."""
+        if self.first_sample_time is None:
+            return None
+        return self.first_sample_time - self.start_time
+
+    def write(self, chunk: np.ndarray):
+        if chunk.ndim > 1:
+            chunk = chunk.mean(axis=1)
+        if self.stopped or not len(chunk):
+            return
+
+        chunk = chunk.astype(np.float32, copy=False)
+        if self.resampler:
+            # resampled here, in the producer's thread, so that the audio callback only has to copy
+            chunk = self.resampler.process(chunk[np.newaxis])[0]
+        if len(chunk):
+            self.chunks.append(chunk)
+
+    def finish(self):
+        """Marks the playback as complete. It's done once everything written was played."""
+        if self.resampler and not self.stopped:
+            tail = self.resampler.process()[0]
+            if len(tail):
+                self.chunks.append(tail)
+        self.finished = True
+
+    def stop(self):
+        """Stops the playback immediately, dropping everything that wasn't played yet."""
+        self.stopped = True
+        self.chunks.clear()
+        self.__set_done()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self.done.wait(timeout)
+
+    def read(self, out: np.ndarray) -> int:
+        """Copies the next frames into `out` (runs in the audio callback).
+
+        Returns:
+            int: The number of frames copied.
+        """
+        frames = 0
+        while frames < len(out) and self.chunks:
+            chunk = self.chunks[0]
+            count = min(len(out) - frames, len(chunk) - self.chunk_offset)
+            out[frames : frames + count] = chunk[
+                self.chunk_offset : self.chunk_offset + count
+            ]
+            frames += count
+            self.chunk_offset += count
+            if self.chunk_offset == len(chunk):
+                self.chunks.popleft()
+                self.chunk_offset = 0
+
+        if frames and self.first_sample_time is None:
+            self.first_sample_time = time.perf_counter()
+            self.started.set()
+
+        if not self.chunks:
+            if self.finished:
+                self.__set_done()
+            elif frames < len(out) and self.first_sample_time is not None:
+                self.underruns += 1
+
+        return frames
+
+    def __set_done(self):
+        if self.done.is_set():
+            return
+        self.started.set()
+        self.done.set()
+        if not self.future.done():
+            self.future.set_result(self)
+
+
+class AudioMixer:
+    """The only owner of the audio output device. All wingmen play their audio through it.
+
+    Every source (wingman) has its own queue, so its responses are played one after another instead of cutting each other off.
+    Different sources are mixed, and all but the one that started talking last are ducked.
+
+    The output stream is opened once at a fixed sample rate and kept open. Playbacks with another sample rate are resampled as they're written.
+    """
+
+    def __init__(
+        self,
+        samplerate: int = 48000,
+        duck_db: float = -12,
+        blocksize: int = 0,
+        latency: str = "low",
+    ):
+        self.samplerate = samplerate
+        self.duck_gain = 10 ** (duck_db / 20)
+        self.blocksize = blocksize
+        self.latency = latency
+
+        self.queues: dict[str, deque[AudioPlayback]] = {}
+        self.gains: dict[str, float] = {}
+        """The current gain of each source, ramped towards its target to avoid clicks."""
+        self.lock = threading.Lock()
+        self.stream: sd.OutputStream | None = None
+        self.stream_lock = threading.Lock()
+        self.mix_buffer = np.zeros(0, dtype=np.float32)
+
+    def enqueue(self, source: str, samplerate: int) -> AudioPlayback:
+        """Queues a new playback. It starts once the source's previous playbacks are done. This never blocks.
+
+        Args:
+            source (str): Who is playing, e.g. the name of the wingman.
+            samplerate (int): The sample rate of the chunks that will be written.
+
+        Returns:
+            AudioPlayback: Write the audio chunks to it. Its `future` resolves once it was played.
+        """
+        playback = AudioPlayback(source, samplerate, self.samplerate)
+        with self.lock:
+            self.queues.setdefault(source, deque()).append(playback)
+
+        self.__open_stream()
+        return playback
+
+    def stop(self, source: str | None = None):
+        """Stops and drops everything queued for the source, or for all sources if None."""
+        with self.lock:
+            sources = [source] if source else list(self.queues.keys())
+            for name in sources:
+                for playback in self.queues.pop(name, []):
+                    playback.stop()
+
+    def close(self):
+        self.stop()
+        with self.stream_lock:
+            if self.stream:
+                self.stream.close()
+                self.stream = None
+
+    def __open_stream(self):
+        with self.stream_lock:
+            if self.stream:
+                return
+
+            self.stream = sd.OutputStream(
+                samplerate=self.samplerate,
+                channels=1,
+                dtype="float32",
+                blocksize=self.blocksize,
+                latency=self.latency,
+                callback=self.__fill_output,
+            )
+            self.stream.start()
+
+    def __fill_output(self, outdata, frames, _time, _status):
+        out = outdata[:, 0]
+        out.fill(0)
+        if len(self.mix_buffer) < frames:
+            self.mix_buffer = np.zeros(frames, dtype=np.float32)
+        buffer = self.mix_buffer[:frames]
+
+        with self.lock:
+            # the source that started talking last is in the foreground
+            audible = [
+                (queue[0].start_time, source)
+                for source, queue in self.queues.items()
+                if queue and (queue[0].chunks or queue[0].started.is_set())
+            ]
+            foreground = max(audible)[1] if audible else None
+
+            for source in list(self.queues.keys()):
+                queue = self.queues[source]
+                copied = self.__read_source(queue, buffer)
+
+                target_gain = 1.0 if source == foreground else self.duck_gain
+                gain = self.gains.get(source, target_gain)
+                if gain == target_gain:
+                    out[:copied] += buffer[:copied] * gain
+                else:
+                    out[:copied] += buffer[:copied] * np.linspace(
+                        gain, target_gain, copied, dtype=np.float32
+                    )
+
+                if queue:
+                    self.gains[source] = target_gain
+                else:
+                    del self.queues[source]
+                    self.gains.pop(source, None)
+
+        np.clip(out, -1, 1, out=out)
+
+    def __read_source(self, queue: deque[AudioPlayback], buffer: np.ndarray) -> int:
+        """Reads the next frames of a source. If a playback ends within the block, the next one continues without a gap."""
+        copied = 0
+        while queue and copied < len(buffer):
+            playback = queue[0]
+            copied += playback.read(buffer[copied:])
+            if playback.done.is_set():
+                queue.popleft()
+            else:
+                break
+        return copied
@@ -1,13 +1,42 @@
 import io
 from os import path
+from typing import Iterable
 import numpy as np
 import soundfile as sf
-import sounddevice as sd
-from scipy.signal import resample
-from services.sound_effects import get_sound_effects_from_config
+from services.resampler import resample
+from services.printr import Printr
+from services.sound_effects import EffectChain, EffectChainPool
+from services.audio_mixer import AudioMixer, AudioPlayback
+
+CHUNK_SECONDS = 0.2
+"""Decoded audio is run through the effects and played in chunks of this length, so that the output starts after the first chunk."""
+EFFECT_TAIL_SECONDS = 0.25
+"""Silence pushed through the effects after the last chunk to flush their latency (e.g. PitchShift, Resample)."""
+
+printr = Printr()
 
 
 class AudioPlayer:
+    _beep_cache: dict[tuple[int, tuple], np.ndarray] = {}
+    """The decoded and resampled beep sound by (sample rate, channel layout), shared by all players."""
+    _default_mixer: AudioMixer | None = None
+    """Used if the app didn't provide a mixer, shared by all players."""
+
+    def __init__(self, source: str = "", mixer: AudioMixer | None = None):
+        self.source = source
+        """Who is playing, e.g. the name of the wingman. Audio of the same source is played in order, different sources are mixed."""
+        self.mixer = mixer
+        """Owns the audio output. Set by the app, so that all wingmen share it."""
+        self.effect_chains: EffectChainPool | None = None
+        """The compiled sound effects of the wingman this player belongs to."""
+
+    def get_effect_chains(self, config: dict) -> EffectChainPool:
+        """Returns the effect chains for the given wingman config. They are only compiled again if the sound config changed."""
+        config_hash = EffectChain.get_config_hash(config)
+        if self.effect_chains is None or self.effect_chains.config_hash != config_hash:
+            self.effect_chains = EffectChainPool(config, config_hash)
+        return self.effect_chains
+
     def play_file(self, filename: str):
         with open(filename, "rb") as f:
             audio_data = f.read()
@@ -15,17 +44,22 @@ class AudioPlayer:
 
     def play(self, stream: bytes):
         audio, sample_rate = self._get_audio_from_stream(stream)
-        sd.play(audio, sample_rate)
-        sd.wait()
+        self.play_audio(audio, sample_rate).wait()
 
     def stream(self, stream: bytes):
         audio, sample_rate = self._get_audio_from_stream(stream)
-        sd.play(audio, sample_rate)
-        sd.wait()
+        self.play_audio(audio, sample_rate).wait()
+
+    def play_audio(self, audio: np.ndarray, sample_rate: int) -> AudioPlayback:
+        """Queues the audio without effects. Doesn't block."""
+        playback = self.get_mixer().enqueue(self.source, sample_rate)
+        playback.write(audio)
+        playback.finish()
+        return playback
 
     def stream_with_effects(
         self, input_data: bytes | tuple, config: dict, wait: bool = False
-    ):
+    ) -> AudioPlayback:
         if isinstance(input_data, bytes):
             audio, sample_rate = self._get_audio_from_stream(input_data)
         elif isinstance(input_data, tuple):
@@ -33,29 +67,104 @@ class AudioPlayer:
         else:
             raise TypeError("Invalid input type for stream_with_effects")
 
-        sound_effects = get_sound_effects_from_config(config)
-        add_beep = config.get("sound", {}).get("play_beep", False)
-
-        for sound_effect in sound_effects:
-            audio = sound_effect(audio, sample_rate)
+        return self.stream_chunks_with_effects(
+            self.get_chunks(audio, sample_rate), sample_rate, config, wait
+        )
 
-        if add_beep:
-            audio = self._add_beep_effect(audio, sample_rate)
+    def get_chunks(self, audio: np.ndarray, sample_rate: int) -> Iterable[np.ndarray]:
+        """Cuts audio into float32 chunks for stream_chunks_with_effects(). Each chunk is only converted when it's needed."""
+        chunk_length = max(1, int(sample_rate * CHUNK_SECONDS))
+        return (
+            self.to_float32(audio[start : start + chunk_length])
+            for start in range(0, len(audio), chunk_length)
+        )
 
-        sd.play(audio, sample_rate)
+    def stream_chunks_with_effects(
+        self,
+        chunks: Iterable[np.ndarray],
+        sample_rate: int,
+        config: dict,
+        wait: bool = False,
+    ) -> AudioPlayback:
+        """Plays audio while it's still arriving. Every chunk is run through the wingman's effects and played as soon as it's ready.
+
+        Args:
+            chunks (Iterable[np.ndarray]): The float32 audio chunks, e.g. decoded from a TTS response stream.
+            sample_rate (int): The sample rate of the chunks.
+            config (dict): The wingman's config with its sound settings.
+            wait (bool): Block until the audio was played completely.
+
+        Returns:
+            AudioPlayback: The playback, e.g. to wait for it (or its `future`) or to read its time_to_first_sample.
+        """
+        stream = self.start_stream_with_effects(sample_rate, config)
+        try:
+            for chunk in chunks:
+                stream.write(chunk)
+        finally:
+            # even if producing the chunks failed, so that the source's next playback isn't stuck behind this one
+            stream.finish()
 
         if wait:
-            sd.wait()
+            stream.playback.wait()
+        return stream.playback
+
+    def start_stream_with_effects(
+        self, sample_rate: int, config: dict
+    ) -> "EffectStream":
+        """Starts a playback you can push chunks to as they arrive, e.g. from an async TTS stream or a callback.
+        Call finish() on it after the last chunk."""
+        return EffectStream(self, self.get_mixer().enqueue(self.source, sample_rate), config)
+
+    def get_mixer(self) -> AudioMixer:
+        if self.mixer:
+            return self.mixer
+        if AudioPlayer._default_mixer is None:
+            AudioPlayer._default_mixer = AudioMixer()
+        return AudioPlayer._default_mixer
 
     def get_audio_from_file(self, filename: str) -> tuple:
         audio, sample_rate = sf.read(filename, dtype="float32")
         return audio, sample_rate
 
+    def get_audio_from_bytes(self, data: bytes) -> tuple:
+        """Decodes audio in a container format (wav, mp3, ogg...)."""
+        return self._get_audio_from_stream(data)
+
     def _get_audio_from_stream(self, stream: bytes) -> tuple:
         audio, sample_rate = sf.read(io.BytesIO(stream), dtype="float32")
         return audio, sample_rate
 
-    def _add_beep_effect(self, audio: np.ndarray, sample_rate: int) -> np.ndarray:
+    def get_audio_from_pcm(
+        self, pcm: bytes, dtype: str = "int16", channels: int = 1
+    ) -> np.ndarray:
+        """Wraps raw PCM as an array without copying it. Convert it with to_float32() where it's used."""
+        sample_type = np.dtype(dtype).newbyteorder("<")
+        # a trailing partial sample (e.g. a cut off network chunk) can't be wrapped
+        length = len(pcm) - len(pcm) % (sample_type.itemsize * channels)
+        audio = np.frombuffer(pcm, dtype=sample_type, count=length // sample_type.itemsize)
+        if channels > 1:
+            audio = audio.reshape(-1, channels)
+        return audio
+
+    def to_float32(self, audio: np.ndarray) -> np.ndarray:
+        if audio.dtype.kind == "i":
+            return audio.astype(np.float32) / np.float32(-np.iinfo(audio.dtype).min)
+        return audio.astype(np.float32, copy=False)
+
+    def get_beep(self, sample_rate: int, channel_shape: tuple) -> np.ndarray:
+        """Returns the beep sound matching the given sample rate and channel layout.
+        It's only read from disk and resampled once per process and layout.
+
+        Args:
+            sample_rate (int): The sample rate of the audio the beep is added to.
+            channel_shape (tuple): The shape of the audio except for its length, e.g. () for mono or (2,) for stereo.
+        """
+        key = (sample_rate, channel_shape)
+        beep_audio = AudioPlayer._beep_cache.get(key)
+        if beep_audio is not None:
+            return beep_audio
+
         bundle_dir = path.abspath(path.dirname(__file__))
         beep_audio, beep_sample_rate = self.get_audio_from_file(
             path.join(bundle_dir, "../audio_samples/beep.wav")
@@ -65,20 +174,67 @@ class AudioPlayer:
         if beep_sample_rate != sample_rate:
             beep_audio = self._resample_audio(beep_audio, beep_sample_rate, sample_rate)
 
-        # Concatenate the beep sound to the start and end of the audio
-        audio_with_beeps = np.concatenate((beep_audio, audio, beep_audio), axis=0)
+        # the beep is mono, so we copy it to all channels (once) if needed
+        if channel_shape:
+            beep_audio = np.repeat(beep_audio[:, np.newaxis], channel_shape[0], axis=1)
 
-        return audio_with_beeps
+        beep_audio = beep_audio.astype(np.float32)
+        AudioPlayer._beep_cache[key] = beep_audio
+        return beep_audio
 
     def _resample_audio(
         self, audio: np.ndarray, original_sample_rate: int, target_sample_rate: int
     ) -> np.ndarray:
-        # Calculate the number of samples after resampling
-        num_original_samples = audio.shape[0]
-        num_target_samples = int(
-            round(num_original_samples * target_sample_rate / original_sample_rate)
+        return resample(audio, original_sample_rate, target_sample_rate)
+
+
+class EffectStream:
+    """A playback that runs every chunk written to it through the wingman's sound effects."""
+
+    def __init__(self, audio_player: AudioPlayer, playback: AudioPlayback, config: dict):
+        self.audio_player = audio_player
+        self.playback = playback
+        self.sample_rate = playback.samplerate
+        self.debug = config.get("features", {}).get("debug_mode", False)
+
+        self.effect_chains = audio_player.get_effect_chains(config)
+        self.effect_chain = self.effect_chains.get()
+        if self.effect_chain.play_beep:
+            self.playback.write(self.__get_beep())
+
+    def write(self, chunk: np.ndarray):
+        chunk = self.audio_player.to_float32(chunk)
+        # keep the effects' state between chunks so reverb tails etc. continue seamlessly
+        self.playback.write(
+            self.effect_chain.process(chunk, self.sample_rate, reset=False)
         )
-        # Use scipy.signal resample method to resample the audio to the target sample rate
-        resampled_audio = resample(audio, num_target_samples)
 
-        return resampled_audio
+    def finish(self):
+        if self.effect_chain is None:
+            return
+
+        try:
+            if self.effect_chain.board is not None:
+                tail = np.zeros(int(self.sample_rate * EFFECT_TAIL_SECONDS), np.float32)
+                self.write(tail)
+            if self.effect_chain.play_beep:
+                self.playback.write(self.__get_beep())
+        finally:
+            self.effect_chains.release(self.effect_chain)
+            self.effect_chain = None
+            self.playback.finish()
+
+        if self.debug:
+            self.__print_time_to_first_sample()
+
+    def __get_beep(self) -> np.ndarray:
+        return self.audio_player.get_beep(self.sample_rate, ())
+
+    def __print_time_to_first_sample(self):
+        # the first sample is usually played while we're still processing, but give the device a moment if not
+        self.playback.started.wait(0.5)
+        if self.playback.time_to_first_sample is not None:
+            printr.print(
+                f"   Time to first sample: {self.playback.time_to_first_sample * 1000:.0f}ms",
+                tags="info",
+            )
@@ -1,11 +1,27 @@
+import io
+import queue
+import threading
+from typing import Callable
 import numpy
 import sounddevice
 import soundfile
+from services.audio_buffer import RecordingBuffer, RingBuffer
 from services.printr import Printr
 from services.file_creator import FileCreator
+from services.resampler import resample
+from services.voice_activity import VoiceActivitySegmenter, trim_silence
 
 RECORDING_PATH = "audio_output"
-RECORDING_FILE: str = "recording.wav"
+RECORDING_FILE: str = "recording"
+
+# format name in config -> (soundfile format, soundfile subtype, file extension)
+UPLOAD_FORMATS = {
+    "wav": ("WAV", "PCM_16", "wav"),
+    "flac": ("FLAC", "PCM_16", "flac"),
+    "ogg": ("OGG", "OPUS", "ogg"),
+}
+OPUS_SAMPLERATES = (8000, 12000, 16000, 24000, 48000)
+"""The only sample rates the Opus encoder accepts."""
 
 printr = Printr()
 
@@ -18,11 +34,28 @@ class AudioRecorder(FileCreator):
         channels: int = 1,
     ):
         super().__init__(app_root_dir, RECORDING_PATH)
-        self.file_path = self.get_full_file_path(RECORDING_FILE)
 
         self.samplerate = samplerate
+        self.channels = channels
         self.is_recording = False
-        self.recording = None
+        self.recording_buffer = RecordingBuffer(samplerate, channels)
+
+        self.preroll_buffer: RingBuffer | None = None
+        """Only set if the input stream is kept open. Holds the audio captured right before a recording starts."""
+
+        self.voice_activation_queue: queue.Queue | None = None
+        """Only set if voice activation is running. Passes the input stream frames to the segmenter thread."""
+        self.voice_activation_thread: threading.Thread | None = None
+
+        self.segment_queue: queue.Queue | None = None
+        """Only set while a recording is cut into segments. Passes the recorded frames to the segmenter thread."""
+        self.segment_thread: threading.Thread | None = None
+
+        # guards the buffers against concurrent access from the input stream callback
+        self.lock = threading.Lock()
+        # serializes starting and stopping the input stream (from key presses, voice activation and the GUI).
+        # This can't be self.lock: stopping waits for the callback, which may wait for self.lock.
+        self.stream_lock = threading.Lock()
 
         self.recstream = sounddevice.InputStream(
             callback=self.__handle_input_stream,
@@ -31,36 +64,271 @@ class AudioRecorder(FileCreator):
         )
 
     def __handle_input_stream(self, indata, _frames, _time, _status):
-        if self.is_recording:
-            if self.recording is None:
-                self.recording = indata.copy()
+        with self.lock:
+            if self.is_recording:
+                if self.segment_queue is not None:
+                    self.segment_queue.put_nowait(indata.copy())
+                else:
+                    self.recording_buffer.append(indata)
+                return
+            if self.preroll_buffer is not None:
+                self.preroll_buffer.append(indata)
+
+        # read once, stop_voice_activation may set it to None in between
+        voice_activation_queue = self.voice_activation_queue
+        if voice_activation_queue is not None:
+            try:
+                voice_activation_queue.put_nowait(indata.copy())
+            except queue.Full:
+                pass  # the segmenter can't keep up, so we drop frames rather than blocking the stream
+
+    def __update_stream(self):
+        """Keeps the input stream open as long as someone needs it."""
+        with self.stream_lock:
+            # checked under the lock, so the last caller always sees the latest state
+            needs_stream = (
+                self.is_recording
+                or self.preroll_buffer is not None
+                or self.voice_activation_queue is not None
+            )
+            if needs_stream and not self.recstream.active:
+                self.recstream.start()
+            elif not needs_stream and self.recstream.active:
+                self.recstream.stop()
+
+    def set_preroll(self, preroll_ms: int):
+        """Keeps the input stream open all the time and prepends the last `preroll_ms` milliseconds
+        of audio to every recording, so that the first syllable isn't lost while the stream starts up.
+
+        Args:
+            preroll_ms (int): Length of the pre-roll in milliseconds. 0 closes the stream between recordings again.
+        """
+        with self.lock:
+            if preroll_ms and preroll_ms > 0:
+                self.preroll_buffer = RingBuffer(
+                    self.samplerate, self.channels, preroll_ms / 1000
+                )
             else:
-                self.recording = numpy.concatenate((self.recording, indata.copy()))
+                self.preroll_buffer = None
 
-    def start_recording(self):
+        self.__update_stream()
+
+    def start_voice_activation(
+        self,
+        segmenter: VoiceActivitySegmenter,
+        on_utterance: Callable[[numpy.ndarray], None],
+    ):
+        """Keeps the input stream open and cuts it into utterances using the given segmenter.
+        The segmenter runs in its own thread, so the input stream callback only has to hand over the frames.
+
+        Args:
+            segmenter (VoiceActivitySegmenter): Detects the utterances in the stream.
+            on_utterance (Callable[[numpy.ndarray], None]): Called (in the segmenter thread) with each recorded utterance. Use `finalize_recording` to encode it.
+        """
+        self.stop_voice_activation()
+
+        frames_queue = queue.Queue(maxsize=500)
+        self.voice_activation_thread = threading.Thread(
+            target=self.__run_segmenter,
+            args=(segmenter, frames_queue, on_utterance),
+            daemon=True,
+        )
+        self.voice_activation_thread.start()
+        self.voice_activation_queue = frames_queue
+        self.__update_stream()
+
+    def stop_voice_activation(self):
+        frames_queue = self.voice_activation_queue
+        if frames_queue is None:
+            return
+
+        self.voice_activation_queue = None
+        self.__update_stream()
+        frames_queue.put(None)
+        self.voice_activation_thread.join()
+        self.voice_activation_thread = None
+
+    def __run_segmenter(
+        self,
+        segmenter: VoiceActivitySegmenter,
+        frames_queue: queue.Queue,
+        on_utterance: Callable[[numpy.ndarray], None],
+        flush_on_stop: bool = False,
+    ):
+        while True:
+            frames = frames_queue.get()
+            if frames is None:
+                if flush_on_stop:
+                    utterance = segmenter.flush()
+                    if utterance is not None:
+                        on_utterance(utterance)
+                return
+            if isinstance(frames, str):  # "reset"
+                segmenter.reset()
+                continue
+
+            for utterance in segmenter.process(frames):
+                on_utterance(utterance)
+
+    def start_recording(
+        self,
+        config: dict | None = None,
+        on_segment: Callable[[numpy.ndarray], None] | None = None,
+    ):
+        """Starts recording from the input stream.
+
+        Args:
+            config (dict | None): The config of the Wingman the recording is meant for. Its `features` determine how the recording is cut into segments.
+            on_segment (Callable[[numpy.ndarray], None] | None): If set, the recording is cut into segments at speech pauses while recording. Each segment is passed to this callback (in the segmenter thread) as soon as it's complete, so that it can be transcribed while the user is still talking.
+        """
         if self.is_recording:
             return
 
-        self.recstream.start()
-        self.is_recording = True
+        segment_queue = None
+        if on_segment:
+            features = config.get("features", {}) if config else {}
+            segmenter = VoiceActivitySegmenter(
+                samplerate=self.samplerate,
+                channels=self.channels,
+                threshold_db=features.get("silence_threshold_db", -45),
+                hangover_ms=features.get("stt_streaming_pause_ms", 500),
+                min_speech_ms=100,
+            )
+            segment_queue = queue.Queue()
+            self.segment_thread = threading.Thread(
+                target=self.__run_segmenter,
+                args=(segmenter, segment_queue, on_segment, True),
+                daemon=True,
+            )
+            self.segment_thread.start()
+
+        with self.lock:
+            if self.preroll_buffer is not None:
+                if segment_queue is not None:
+                    segment_queue.put_nowait(self.preroll_buffer.read())
+                else:
+                    self.recording_buffer.append(self.preroll_buffer.read())
+                self.preroll_buffer.clear()
+            self.segment_queue = segment_queue
+            self.is_recording = True
+
+        voice_activation_queue = self.voice_activation_queue
+        if voice_activation_queue is not None:
+            # push-to-talk takes over, so drop whatever voice activation heard so far
+            try:
+                voice_activation_queue.put_nowait("reset")
+            except queue.Full:
+                pass
+
+        self.__update_stream()
+
         printr.print("Recording started", tags="grey")
 
-    def stop_recording(self) -> None | str:
-        self.recstream.stop()
-        self.is_recording = False
+    def stop_recording(self, config: dict | None = None) -> None | io.BytesIO:
+        """Stops the recording and returns it as in-memory audio file, encoded for the upload to the STT provider.
+
+        Args:
+            config (dict | None): The config of the Wingman the recording is meant for. Its `features` determine the upload encoding. If it has `debug_mode` enabled, the recording is also saved to disk.
+
+        Returns:
+            io.BytesIO | None: The encoded recording or None if it was empty or too short. Always None if the recording was cut into segments: The last segment is passed to `on_segment` before this returns.
+        """
+        with self.lock:
+            self.is_recording = False
+            recording = self.recording_buffer.get_audio()
+            segment_queue = self.segment_queue
+            self.segment_queue = None
+
+        self.__update_stream()
         printr.print("Recording stopped", tags="grey")
 
-        if self.recording is None:
+        if segment_queue is not None:
+            segment_queue.put(None)
+            self.segment_thread.join()
+            self.segment_thread = None
+            return None
+
+        return self.finalize_recording(recording, config)
+
+    def finalize_recording(
+        self, recording: numpy.ndarray | None, config: dict | None = None
+    ) -> None | io.BytesIO:
+        """Trims and encodes a recording for the upload to the STT provider.
+
+        Args:
+            recording (numpy.ndarray | None): The recorded frames (shape: frames x channels).
+            config (dict | None): The config of the Wingman the recording is meant for. Its `features` determine the upload encoding. If it has `debug_mode` enabled, the recording is also saved to disk.
+
+        Returns:
+            io.BytesIO | None: The encoded recording or None if it was empty or too short.
+        """
+        if recording is None:
             printr.print("Ignored empty recording", tags="warn")
             return None
-        if (len(self.recording) / self.samplerate) < 0.15:
+
+        features = config.get("features", {}) if config else {}
+        if features.get("trim_silence", False):
+            recording = trim_silence(
+                recording,
+                self.samplerate,
+                threshold_db=features.get("silence_threshold_db", -45),
+                max_pause_ms=features.get("max_pause_ms", 1000),
+            )
+            if recording is None:
+                printr.print(
+                    "Ignored silent recording. If you did say something, try to lower 'silence_threshold_db' in your config.",
+                    tags="warn",
+                )
+                return None
+
+        if (len(recording) / self.samplerate) < 0.15:
             printr.print("Recording was too short to be handled by the AI", tags="warn")
             return None
 
         try:
-            soundfile.write(self.file_path, self.recording, self.samplerate)
-            self.recording = None
-            return self.file_path
+            audio_file = self.__encode_for_upload(recording, features)
         except IndexError:
             printr.print("Ignored empty recording", tags="warn")
             return None
+
+        if features.get("debug_mode", False):
+            # what we would have uploaded without downsampling and compression
+            original_size = recording.size * 2 + 44
+            upload_size = audio_file.getbuffer().nbytes
+            printr.print(
+                f"   Uploading {upload_size / 1024:.1f} KB ({audio_file.name}), saved {(original_size - upload_size) / 1024:.1f} KB.",
+                tags="info",
+            )
+            with open(self.get_full_file_path(audio_file.name), "wb") as f:
+                f.write(audio_file.getbuffer())
+
+        return audio_file
+
+    def __encode_for_upload(self, recording: numpy.ndarray, features: dict) -> io.BytesIO:
+        """Downmixes, resamples and compresses the recording as configured in the `features`.
+        Whisper resamples everything to 16 kHz mono anyway, so we don't have to upload more than that.
+        """
+        upload_format = features.get("stt_upload_format", "flac")
+        if upload_format not in UPLOAD_FORMATS:
+            printr.print(
+                f"Unknown stt_upload_format '{upload_format}', falling back to 'wav'.",
+                tags="warn",
+            )
+            upload_format = "wav"
+        file_format, subtype, extension = UPLOAD_FORMATS[upload_format]
+
+        audio = recording.mean(axis=1) if recording.shape[1] > 1 else recording[:, 0]
+
+        samplerate = features.get("stt_upload_samplerate", 16000) or self.samplerate
+        if subtype == "OPUS" and samplerate not in OPUS_SAMPLERATES:
+            # e.g. the original 44.1 kHz of the microphone
+            samplerate = min(OPUS_SAMPLERATES, key=lambda rate: abs(rate - samplerate))
+        audio = resample(audio, self.samplerate, samplerate)
+
+        audio_file = io.BytesIO()
+        soundfile.write(audio_file, audio, samplerate, format=file_format, subtype=subtype)
+
+        # the file name is used by the STT APIs to determine the format
+        audio_file.name = f"{RECORDING_FILE}.{extension}"
+        audio_file.seek(0)
+        return audio_file
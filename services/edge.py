@@ -1,11 +1,10 @@
-import random
-from edge_tts import Communicate, VoicesManager
-from services.file_creator import FileCreator
+from typing import AsyncIterator
+from edge_tts import Communicate
+import numpy as np
+from services.edge_voice_catalogue import EdgeVoiceCatalogue
+from services.mp3_stream_decoder import Mp3StreamDecoder
 from services.printr import Printr
 
-RECORDING_PATH = "audio_output"
-OUTPUT_FILE: str = "edge_tts.mp3"
-
 printr = Printr()
 # List available voices in your terminal using 'edge-tts --list-voices'.
 #
@@ -14,49 +13,59 @@ printr = Printr()
 #   Name: de-DE-KillianNeural, Gender: Male
 
 
-class EdgeTTS(FileCreator):
-    def __init__(self, app_root_dir: str):
-        super().__init__(app_root_dir, RECORDING_PATH)
-
+class EdgeTTS:
+    def __init__(self, app_root_dir: str, owner: str = ""):
+        """
+        Args:
+            app_root_dir (str): The app root directory.
+            owner (str): Who uses this instance (e.g. the wingman name), to remember its random voices.
+        """
+        self.owner = owner
+        self.voice_catalogue = EdgeVoiceCatalogue(app_root_dir)
         self.random_voices = {}
 
-    async def generate_speech(
+    async def stream_speech(
         self,
         text: str,
         voice: str = "en-US-GuyNeural",
         rate: str = "+0%",
-    ):
+    ) -> AsyncIterator[tuple[np.ndarray, int]]:
+        """Generates speech in memory and yields it while it's still arriving, without writing an mp3 file.
+
+        Yields:
+            tuple[np.ndarray, int]: The next decoded mono float32 samples and their sample rate.
+        """
         if not text:
             return
 
+        decoder = Mp3StreamDecoder()
         communicate = Communicate(text, voice, rate=rate)
-        file_path = self.get_full_file_path(OUTPUT_FILE)
-        await communicate.save(file_path)
+        async for message in communicate.stream():
+            if message["type"] != "audio":
+                continue  # word boundaries
+            audio = decoder.feed(message["data"])
+            if len(audio):
+                yield audio, decoder.samplerate
 
-        return communicate, file_path
-
-    async def get_random_voice(
-        self, gender: str = "Male", locale: str = "en-US"
-    ) -> str:
-        voices = await VoicesManager.create()
-        voice = voices.find(Gender=gender, Locale=locale)
-        random_voice = random.choice(voice)
-        return random_voice.get("ShortName")
+        audio = decoder.flush()
+        if len(audio):
+            yield audio, decoder.samplerate
 
     async def get_same_random_voice_for_language(
         self, gender="Male", locale: str = "en-US"
-    ) -> str:
-        # if we already have a voice for this language, return it ("cache")
+    ) -> str | None:
+        # The catalogue remembers the voice (also across restarts).
         # Otherwise the voice would change every time we call this function / talk to the AI
         if self.random_voices.get(locale):
             return self.random_voices[locale]
 
-        random_voice = await self.get_random_voice(
-            locale=locale,
-            gender=gender,
+        random_voice = await self.voice_catalogue.get_random_voice(
+            self.owner, gender=gender, locale=locale
         )
-        self.random_voices[locale] = random_voice
-
-        printr.print(f"   Your random EdgeTTS voice: '{random_voice}'.", tags="info")
+        if random_voice:
+            self.random_voices[locale] = random_voice
+            printr.print(
+                f"   Your random EdgeTTS voice: '{random_voice}'.", tags="info"
+            )
 
         return random_voice
@@ -0,0 +1,132 @@
+import json
+import random
+import threading
+import time
+from edge_tts import list_voices
+from services.file_creator import FileCreator
+from services.printr import Printr
+
+CATALOGUE_PATH = "audio_output/edge_tts"
+VOICES_FILE = "voices.json"
+RANDOM_VOICES_FILE = "random_voices.json"
+
+printr = Printr()
+
+
+class EdgeVoiceCatalogue(FileCreator):
+    """The EdgeTTS voice list, cached on disk and indexed by (Locale, Gender).
+
+    The list is only downloaded again once it's older than the TTL, so finding a voice for a new locale is a dict lookup.
+    The random voice picked for each wingman, locale and gender is stored as well, so it stays the same across restarts.
+
+    The catalogue is shared by all wingmen of the process.
+    """
+
+    _index: dict[tuple[str, str], list[str]] | None = None
+    _fetched_at: float = 0
+    _random_voices: dict[str, dict[str, str]] | None = None
+    _lock = threading.Lock()
+
+    def __init__(self, app_root_dir: str, ttl_hours: float = 24 * 7):
+        super().__init__(app_root_dir, CATALOGUE_PATH)
+        self.ttl_seconds = ttl_hours * 60 * 60
+
+        with EdgeVoiceCatalogue._lock:
+            if EdgeVoiceCatalogue._index is None:
+                self.__load_voices()
+            if EdgeVoiceCatalogue._random_voices is None:
+                EdgeVoiceCatalogue._random_voices = (
+                    self.__read_json(RANDOM_VOICES_FILE) or {}
+                )
+
+    async def find_voices(self, gender: str = "Male", locale: str = "en-US") -> list[str]:
+        """Returns the short names of all voices for the locale and gender, like "en-US-GuyNeural"."""
+        if self.__is_stale():
+            await self.refresh()
+        return EdgeVoiceCatalogue._index.get((locale, gender), [])
+
+    async def get_random_voice(
+        self, owner: str, gender: str = "Male", locale: str = "en-US"
+    ) -> str | None:
+        """Returns the random voice picked for the owner (e.g. a wingman), locale and gender, and picks one if there is none yet.
+
+        Args:
+            owner (str): Who the voice is for. Different owners get different random picks.
+            gender (str): "Male" or "Female".
+            locale (str): The locale, like "en-US".
+
+        Returns:
+            str | None: The short name of the voice or None if there is no voice for the locale and gender.
+        """
+        key = f"{locale}/{gender}"
+        with EdgeVoiceCatalogue._lock:
+            voice = EdgeVoiceCatalogue._random_voices.get(owner, {}).get(key)
+        if voice:
+            return voice
+
+        voices = await self.find_voices(gender, locale)
+        if not voices:
+            return None
+
+        voice = random.choice(voices)
+        with EdgeVoiceCatalogue._lock:
+            EdgeVoiceCatalogue._random_voices.setdefault(owner, {})[key] = voice
+            self.__write_json(RANDOM_VOICES_FILE, EdgeVoiceCatalogue._random_voices)
+        return voice
+
+    async def refresh(self):
+        """Downloads the voice list. If that fails, the stale list (if any) is kept."""
+        try:
+            voices = await list_voices()
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            if EdgeVoiceCatalogue._index is None:
+                raise
+            printr.print_warn(f"Could not update the EdgeTTS voice list: {e}")
+            # don't try again for every request
+            EdgeVoiceCatalogue._fetched_at = time.time()
+            return
+
+        fetched_at = time.time()
+        with EdgeVoiceCatalogue._lock:
+            self.__set_voices(voices, fetched_at)
+            self.__write_json(
+                VOICES_FILE, {"fetched_at": fetched_at, "voices": voices}
+            )
+
+    def __is_stale(self) -> bool:
+        return (
+            EdgeVoiceCatalogue._index is None
+            or time.time() - EdgeVoiceCatalogue._fetched_at > self.ttl_seconds
+        )
+
+    def __load_voices(self):
+        data = self.__read_json(VOICES_FILE)
+        if data:
+            self.__set_voices(data.get("voices", []), data.get("fetched_at", 0))
+
+    def __set_voices(self, voices: list[dict], fetched_at: float):
+        index = {}
+        for voice in voices:
+            index.setdefault((voice.get("Locale"), voice.get("Gender")), []).append(
+                voice.get("ShortName")
+            )
+        EdgeVoiceCatalogue._index = index
+        EdgeVoiceCatalogue._fetched_at = fetched_at
+
+    def __read_json(self, file_name: str):
+        try:
+            with open(
+                self.get_full_file_path(file_name), "r", encoding="utf-8"
+            ) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def __write_json(self, file_name: str, data):
+        try:
+            with open(
+                self.get_full_file_path(file_name), "w", encoding="utf-8"
+            ) as file:
+                json.dump(data, file)
+        except OSError as e:
+            printr.print_warn(f"Could not write the EdgeTTS voice catalogue: {e}")
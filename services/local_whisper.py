@@ -0,0 +1,124 @@
+import io
+from dataclasses import dataclass
+from importlib.util import find_spec
+import threading
+from typing import BinaryIO
+import numpy
+import soundfile
+from services.file_creator import FileCreator
+from services.printr import Printr
+from services.resampler import resample
+
+MODEL_PATH = "whisper_models"
+WHISPER_SAMPLERATE = 16000
+
+printr = Printr()
+
+
+@dataclass
+class LocalTranscript:
+    """Has the same fields we use from OpenAI's transcription responses."""
+
+    text: str
+    language: str | None
+
+
+class LocalWhisper(FileCreator):
+    """Runs Whisper offline on the CPU using faster-whisper (CTranslate2) with int8 quantization.
+
+    Models are loaded lazily on first use and shared by all wingmen of the process.
+    They are downloaded once into the `whisper_models` directory and loaded from there without network access afterwards.
+    """
+
+    _models: dict[tuple, any] = {}
+    _lock = threading.Lock()
+
+    def __init__(
+        self,
+        app_root_dir: str,
+        model: str = "base",
+        compute_type: str = "int8",
+        cpu_threads: int = 0,
+        beam_size: int = 1,
+        language: str | None = None,
+    ):
+        super().__init__(app_root_dir, MODEL_PATH)
+        self.model = model
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.beam_size = beam_size
+        self.language = language
+
+    @staticmethod
+    def is_available() -> bool:
+        return find_spec("faster_whisper") is not None
+
+    def get_model(self):
+        key = (self.model, self.compute_type, self.cpu_threads)
+        with LocalWhisper._lock:
+            model = LocalWhisper._models.get(key)
+            if model is None:
+                from faster_whisper import WhisperModel
+
+                printr.print(f"Loading local Whisper model '{self.model}'...", tags="info")
+                params = dict(
+                    device="cpu",
+                    compute_type=self.compute_type,
+                    cpu_threads=self.cpu_threads,
+                    download_root=self.file_dir,
+                )
+                # faster-whisper depends on huggingface_hub
+                from huggingface_hub.utils import LocalEntryNotFoundError
+
+                try:
+                    model = WhisperModel(self.model, local_files_only=True, **params)
+                except LocalEntryNotFoundError:
+                    # not downloaded yet
+                    model = WhisperModel(self.model, **params)
+                LocalWhisper._models[key] = model
+        return model
+
+    def warm_up(self):
+        """Loads the model and runs it once, so that the first real transcription is fast."""
+        self.transcribe_audio(numpy.zeros(WHISPER_SAMPLERATE, dtype=numpy.float32))
+
+    def start_warm_up(self, name: str = "") -> threading.Thread:
+        """Runs warm_up() in the background, because the first start may download the model (hundreds of MB).
+        A transcription that starts before it's done waits for the model.
+
+        Args:
+            name (str): Who the model is warmed up for (e.g. the wingman name), used in the messages.
+
+        Returns:
+            threading.Thread: The background thread.
+        """
+
+        def warm_up():
+            try:
+                self.warm_up()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                printr.print_err(f"{name}: Could not load local Whisper: {e}")
+
+        thread = threading.Thread(
+            target=warm_up, name=f"whisper-warm-up-{name}", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def transcribe(self, audio_input: str | bytes | BinaryIO) -> LocalTranscript:
+        if isinstance(audio_input, bytes):
+            audio_input = io.BytesIO(audio_input)
+
+        audio, samplerate = soundfile.read(audio_input, dtype="float32", always_2d=True)
+        audio = resample(audio.mean(axis=1), samplerate, WHISPER_SAMPLERATE)
+
+        return self.transcribe_audio(audio)
+
+    def transcribe_audio(self, audio: numpy.ndarray) -> LocalTranscript:
+        """Transcribes 16 kHz mono float32 audio."""
+        segments, info = self.get_model().transcribe(
+            audio, beam_size=self.beam_size, language=self.language
+        )
+        # segments is a generator, the actual transcription happens while iterating over it
+        text = "".join(segment.text for segment in segments).strip()
+        return LocalTranscript(text=text, language=info.language)
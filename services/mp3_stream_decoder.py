@@ -0,0 +1,179 @@
+import io
+import numpy as np
+import soundfile as sf
+
+# kbit/s by bitrate index, for MPEG-1 and MPEG-2/2.5 Layer III
+BITRATES = {
+    True: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    False: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+# Hz by MPEG version (from the header) and sample rate index
+SAMPLE_RATES = {
+    3: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    0: [11025, 12000, 8000],
+}
+
+OVERLAP_BYTES = 1024
+"""A Layer III frame can use up to 511 bytes of the frames before it (bit reservoir), and the decoder needs the previous frame to overlap with.
+So every piece is decoded together with the frame before it and at least this many bytes of the frames before that, and their samples are dropped."""
+
+PADDING_FRAMES = 2
+"""Without an Info header, libsndfile estimates the length from the size and the bitrate of the first frame and doesn't decode past it.
+That's too short if the frame sizes vary: a bit with the padding bit (e.g. at 22.05 and 44.1 kHz), a lot with variable bitrate.
+So every piece gets copies of its last frame appended until the estimate covers all its frames, plus this many for rounding.
+They don't change the samples of the frames before them (a frame only depends on the ones before it), and their samples are not read."""
+
+
+class Mp3StreamDecoder:
+    """Decodes an MP3 stream piece by piece while it's still arriving, e.g. from a TTS websocket.
+
+    Only complete frames are decoded. Each piece starts a few frames early (see OVERLAP_BYTES) so it decodes exactly like
+    the same frames decoded in one go, for all sample rates and variable bitrates (see PADDING_FRAMES). Only Layer III (what TTS services send) is supported.
+    A leading Info/Xing header is skipped, so unlike decoding a complete file, the encoder delay isn't trimmed.
+    """
+
+    def __init__(self, min_frames: int = 4):
+        """
+        Args:
+            min_frames (int): Decode only once at least this many new frames arrived. Each frame is 576 or 1152 samples.
+        """
+        self.min_frames = min_frames
+        self.buffer = bytearray()
+        self.frames: list[tuple[int, int]] = []
+        """Offset and length of the complete frames in the buffer."""
+        self.parse_offset = 0
+        self.frames_parsed = 0
+        self.decoded_frames = 0
+        """How many of self.frames were decoded already."""
+        self.samplerate: int | None = None
+        self.samples_per_frame: int | None = None
+
+    def feed(self, data: bytes) -> np.ndarray:
+        """Adds the next bytes of the stream.
+
+        Returns:
+            np.ndarray: The newly decoded mono float32 samples (may be empty).
+        """
+        self.buffer.extend(data)
+        self.__parse_frames()
+        if len(self.frames) - self.decoded_frames < self.min_frames:
+            return np.zeros(0, dtype=np.float32)
+        return self.__decode()
+
+    def flush(self) -> np.ndarray:
+        """Decodes all remaining complete frames at the end of the stream."""
+        if len(self.frames) == self.decoded_frames:
+            return np.zeros(0, dtype=np.float32)
+        return self.__decode()
+
+    def __parse_frames(self):
+        buffer = self.buffer
+        offset = self.parse_offset
+        while offset + 4 <= len(buffer):
+            frame_length = self.__get_frame_length(buffer, offset)
+            if frame_length is None:
+                # not a frame header (e.g. an ID3 tag) - look for the next sync word
+                offset += 1
+                continue
+            if offset + frame_length > len(buffer):
+                break  # the frame is still incomplete
+            if not self.frames_parsed and self.__is_info_frame(
+                buffer[offset : offset + frame_length]
+            ):
+                # no audio, only the length and gapless info of a complete file
+                offset += frame_length
+                continue
+            self.frames.append((offset, frame_length))
+            self.frames_parsed += 1
+            offset += frame_length
+        self.parse_offset = offset
+
+    def __is_info_frame(self, frame: bytearray) -> bool:
+        # the tag follows the side information, which is 9 to 32 bytes long
+        return b"Xing" in frame[:48] or b"Info" in frame[:48]
+
+    def __get_frame_length(self, buffer: bytearray, offset: int) -> int | None:
+        if buffer[offset] != 0xFF or buffer[offset + 1] & 0xE0 != 0xE0:
+            return None
+
+        version = (buffer[offset + 1] >> 3) & 3
+        layer = (buffer[offset + 1] >> 1) & 3
+        bitrate_index = buffer[offset + 2] >> 4
+        samplerate_index = (buffer[offset + 2] >> 2) & 3
+        padding = (buffer[offset + 2] >> 1) & 1
+        if (
+            version == 1  # reserved
+            or layer != 1  # not Layer III
+            or bitrate_index in (0, 15)  # free format or invalid
+            or samplerate_index == 3  # reserved
+        ):
+            return None
+
+        is_mpeg1 = version == 3
+        bitrate = BITRATES[is_mpeg1][bitrate_index] * 1000
+        samplerate = SAMPLE_RATES[version][samplerate_index]
+        if self.samplerate is None:
+            self.samplerate = samplerate
+            self.samples_per_frame = 1152 if is_mpeg1 else 576
+        return (144 if is_mpeg1 else 72) * bitrate // samplerate + padding
+
+    def __decode(self) -> np.ndarray:
+        first = self.decoded_frames
+        # the frame before the first new one has to decode correctly too, so the overlap is counted from there
+        previous = max(0, first - 1)
+        overlap_start = previous
+        while (
+            overlap_start > 0
+            and self.frames[previous][0] - self.frames[overlap_start][0]
+            < OVERLAP_BYTES
+        ):
+            overlap_start -= 1
+
+        start_offset = self.frames[overlap_start][0]
+        last_offset, last_length = self.frames[-1]
+        frame_count = len(self.frames) - overlap_start
+        piece = bytes(self.buffer[start_offset : last_offset + last_length])
+        piece += piece[-last_length:] * self.__get_padding_frames(
+            piece, frame_count, last_length
+        )
+        with sf.SoundFile(io.BytesIO(piece)) as file:
+            # never more than the estimated length, so an Info header (gapless playback) at the start is still respected
+            audio = file.read(
+                frame_count * self.samples_per_frame, dtype="float32", always_2d=True
+            )
+        audio = audio.mean(axis=1) if audio.shape[1] > 1 else audio[:, 0]
+
+        self.decoded_frames = len(self.frames)
+        self.__drop_decoded()
+        return audio[(first - overlap_start) * self.samples_per_frame :]
+
+    def __get_padding_frames(
+        self, piece: bytes, frame_count: int, last_length: int
+    ) -> int:
+        """How many copies of the last frame libsndfile needs to estimate at least frame_count frames for the piece."""
+        is_mpeg1 = self.samples_per_frame == 1152
+        first_bitrate = BITRATES[is_mpeg1][piece[2] >> 4] * 1000
+        needed_bytes = (
+            frame_count * self.samples_per_frame * first_bitrate // 8 // self.samplerate
+        )
+        missing_bytes = max(0, needed_bytes - len(piece))
+        return -(-missing_bytes // last_length) + PADDING_FRAMES
+
+    def __drop_decoded(self):
+        """Forgets the bytes before the frames the next piece needs as overlap."""
+        # all frames are decoded, so the last one is the frame before the next piece
+        previous_offset = self.frames[-1][0]
+        keep = len(self.frames) - 1
+        while keep > 0 and previous_offset - self.frames[keep][0] < OVERLAP_BYTES:
+            keep -= 1
+        if keep == 0:
+            return
+
+        removed = self.frames[keep][0]
+        del self.buffer[:removed]
+        self.frames = [
+            (offset - removed, length) for offset, length in self.frames[keep:]
+        ]
+        self.decoded_frames -= keep
+        self.parse_offset -= removed
@@ -1,10 +1,16 @@
 from dataclasses import dataclass
+import io
 import re
+from typing import BinaryIO
 from openai import OpenAI, APIStatusError, AzureOpenAI
+import soundfile
 from services.printr import Printr
 
 printr = Printr()
 
+PCM_SAMPLERATE = 24000
+"""The sample rate of OpenAI's raw PCM speech output."""
+
 
 @dataclass
 class AzureConfig:
@@ -30,7 +36,7 @@ class OpenAi:
 
     def transcribe(
         self,
-        filename: str,
+        audio_input: str | bytes | BinaryIO,
         model: str = "whisper-1",
         response_format: str = "json",
         azure_config: AzureConfig | None = None,
@@ -47,14 +53,25 @@ class OpenAi:
             )
 
         try:
-            with open(filename, "rb") as audio_input:
-                transcript = client.audio.transcriptions.create(
-                    model=model,
-                    file=audio_input,
-                    response_format=response_format,
-                    **params,
-                )
-                return transcript
+            if isinstance(audio_input, str):
+                with open(audio_input, "rb") as audio_file:
+                    return client.audio.transcriptions.create(
+                        model=model,
+                        file=audio_file,
+                        response_format=response_format,
+                        **params,
+                    )
+
+            if isinstance(audio_input, bytes):
+                # Whisper determines the audio format by the file name, so it has to match the encoding (wav, flac, ogg...)
+                audio_input = (self.__get_file_name(audio_input), audio_input)
+
+            return client.audio.transcriptions.create(
+                model=model,
+                file=audio_input,
+                response_format=response_format,
+                **params,
+            )
         except APIStatusError as e:
             self._handle_api_error(e)
             return None
@@ -62,6 +79,13 @@ class OpenAi:
             self._handle_key_error()
             return None
 
+    def __get_file_name(self, audio: bytes) -> str:
+        try:
+            file_format = soundfile.info(io.BytesIO(audio)).format
+        except soundfile.LibsndfileError:
+            file_format = "wav"
+        return f"recording.{file_format.lower()}"
+
     def ask(
         self,
         messages: list[dict[str, str]],
@@ -106,7 +130,8 @@ class OpenAi:
             self._handle_key_error()
             return None
 
-    def speak(self, text: str, voice: str = "nova"):
+    def speak(self, text: str, voice: str = "nova", response_format: str = "mp3"):
+        """Synthesizes speech. Use response_format "pcm" to get raw 24kHz 16-bit mono samples that don't need decoding."""
         try:
             if not voice:
                 voice = "nova"
@@ -114,6 +139,7 @@ class OpenAi:
                 model="tts-1",
                 voice=voice,
                 input=text,
+                response_format=response_format,
             )
             return response
         except APIStatusError as e:
@@ -0,0 +1,64 @@
+import asyncio
+from concurrent.futures import Future
+import threading
+import traceback
+from typing import Coroutine
+from services.printr import Printr
+
+printr = Printr()
+
+
+class PipelineWorker:
+    """Runs the wingmen's processing on one long-lived event loop in a background thread.
+
+    Jobs are queued and processed one after another. Because the loop lives as long as the app,
+    async resources like HTTP sessions and connection pools can be reused across turns.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.queue: asyncio.Queue = None  # created in the worker thread
+        self.ready = threading.Event()
+
+        self.thread = threading.Thread(
+            target=self.__run, name="pipeline-worker", daemon=True
+        )
+        self.thread.start()
+        self.ready.wait()
+
+    def __run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.__process_jobs())
+
+    async def __process_jobs(self):
+        self.queue = asyncio.Queue()
+        self.ready.set()
+
+        while True:
+            job, future = await self.queue.get()
+            if job is None:
+                return
+
+            try:
+                future.set_result(await job)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                # keep the worker alive, whatever the job did
+                printr.print_err(
+                    f"{type(e).__name__}: {e}" if str(e) else type(e).__name__,
+                    wait_for_gui=False,
+                )
+                printr.print(traceback.format_exc(), console_only=True)
+                future.set_exception(e)
+
+    def submit(self, job: Coroutine) -> Future:
+        """Queues a coroutine to be run on the worker's event loop. Can be called from any thread.
+
+        Args:
+            job (Coroutine): The coroutine to run, e.g. `wingman.process(recording)`.
+
+        Returns:
+            Future: Resolves with the result of the coroutine once it was processed.
+        """
+        future = Future()
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, (job, future))
+        return future
@@ -0,0 +1,67 @@
+import re
+
+# Sentence ends in Latin, Greek, Cyrillic etc. ("."), CJK ("。！？"), Hindi ("।"), Arabic ("؟") and others.
+# Latin-style punctuation only ends a sentence if it's followed by whitespace, so decimals (3.5) and URLs aren't split.
+# Full-width punctuation is never followed by a space in CJK text, so it always ends a sentence.
+SENTENCE_END = re.compile(
+    r"(?<=[.!?…;])[\"'”’»)\]]*\s+|(?<=[。！？；।॥؟۔])[\"'”’」』)]*\s*|\n+"
+)
+CLAUSE_END = re.compile(r"(?<=[,:—–])\s+|(?<=[，、：])\s*")
+
+
+def split_sentences(
+    text: str, min_length: int = 20, max_length: int = 200
+) -> list[str]:
+    """Splits a text into sentences that can be synthesized one by one.
+
+    This only relies on punctuation, so it works for all languages that use it to end sentences.
+    Fragments shorter than min_length (like "Ok." or "e.g.") are merged with the next one.
+    Sentences longer than max_length are split at clauses (commas etc.) if possible.
+
+    Args:
+        text (str): The text to split.
+        min_length (int): The minimum number of characters of a part.
+        max_length (int): Sentences longer than this are split into clauses.
+
+    Returns:
+        list[str]: The parts of the text, in order and without surrounding whitespace.
+    """
+    sentences = []
+    for sentence in SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if len(sentence) > max_length:
+            sentences.extend(split_clauses(sentence, max_length))
+        else:
+            sentences.append(sentence)
+
+    parts = []
+    for sentence in sentences:
+        if parts and len(parts[-1]) < min_length:
+            parts[-1] = join_parts(parts[-1], sentence)
+        else:
+            parts.append(sentence)
+
+    # don't leave a short fragment at the end either
+    if len(parts) > 1 and len(parts[-1]) < min_length:
+        last = parts.pop()
+        parts[-1] = join_parts(parts[-1], last)
+
+    return parts
+
+
+def split_clauses(sentence: str, max_length: int) -> list[str]:
+    clauses = []
+    for clause in CLAUSE_END.split(sentence):
+        if clauses and len(clauses[-1]) + len(clause) < max_length:
+            clauses[-1] = join_parts(clauses[-1], clause)
+        elif clause:
+            clauses.append(clause)
+    return clauses
+
+
+def join_parts(first: str, second: str) -> str:
+    # CJK text has no spaces between sentences
+    separator = "" if first[-1] in "。！？；，、：」』" else " "
+    return f"{first}{separator}{second}"
@@ -1,4 +1,7 @@
 from enum import Enum
+import json
+import threading
+import numpy as np
 from pedalboard import (
     Compressor,
     HighpassFilter,
@@ -15,8 +18,10 @@ from pedalboard import (
 
 
 # Credits to Discord community member @psigen aka GH @JaydiCodes!
-class SoundEffects(Enum):
-    ROBOT = Pedalboard(
+# Reverb, Delay and Chorus keep state (their tails) between calls, so every effect chain needs its own plugin instances.
+# That's why these are factories and not shared Pedalboard instances.
+def create_robot() -> Pedalboard:
+    return Pedalboard(
         [
             PitchShift(semitones=-1),
             Delay(delay_seconds=0.01, feedback=0.5, mix=0.2),
@@ -27,7 +32,10 @@ class SoundEffects(Enum):
             Gain(gain_db=8),
         ]
     )
-    RADIO = Pedalboard(
+
+
+def create_radio() -> Pedalboard:
+    return Pedalboard(
         [
             HighpassFilter(1000),
             LowpassFilter(5000),
@@ -37,7 +45,10 @@ class SoundEffects(Enum):
             Gain(gain_db=6),
         ]
     )
-    INTERIOR_HELMET = Pedalboard(
+
+
+def create_interior_helmet() -> Pedalboard:
+    return Pedalboard(
         [
             PeakFilter(1000, 6, 2),
             Delay(delay_seconds=0.01, mix=0.02),
@@ -51,7 +62,10 @@ class SoundEffects(Enum):
             ),
         ]
     )
-    INTERIOR_SMALL = Pedalboard(
+
+
+def create_interior_small() -> Pedalboard:
+    return Pedalboard(
         [
             Delay(delay_seconds=0.03, mix=0.05),
             Reverb(
@@ -59,7 +73,10 @@ class SoundEffects(Enum):
             ),
         ]
     )
-    INTERIOR_MEDIUM = Pedalboard(
+
+
+def create_interior_medium() -> Pedalboard:
+    return Pedalboard(
         [
             Delay(delay_seconds=0.09, mix=0.07),
             Reverb(
@@ -67,7 +84,10 @@ class SoundEffects(Enum):
             ),
         ]
     )
-    INTERIOR_LARGE = Pedalboard(
+
+
+def create_interior_large() -> Pedalboard:
+    return Pedalboard(
         [
             Delay(delay_seconds=0.2, mix=0.1),
             Reverb(room_size=0.2, dry_level=0.5, wet_level=0.5, width=0.5),
@@ -75,27 +95,118 @@ class SoundEffects(Enum):
     )
 
 
-def get_sound_effects_from_config(config: dict):
+class SoundEffects(Enum):
+    ROBOT = "ROBOT"
+    RADIO = "RADIO"
+    INTERIOR_HELMET = "INTERIOR_HELMET"
+    INTERIOR_SMALL = "INTERIOR_SMALL"
+    INTERIOR_MEDIUM = "INTERIOR_MEDIUM"
+    INTERIOR_LARGE = "INTERIOR_LARGE"
+
+    def create(self) -> Pedalboard:
+        """Builds a new, independent instance of this effect."""
+        return SOUND_EFFECT_FACTORIES[self]()
+
+
+SOUND_EFFECT_FACTORIES = {
+    SoundEffects.ROBOT: create_robot,
+    SoundEffects.RADIO: create_radio,
+    SoundEffects.INTERIOR_HELMET: create_interior_helmet,
+    SoundEffects.INTERIOR_SMALL: create_interior_small,
+    SoundEffects.INTERIOR_MEDIUM: create_interior_medium,
+    SoundEffects.INTERIOR_LARGE: create_interior_large,
+}
+
+
+def get_sound_effects_from_config(config: dict) -> list[Pedalboard]:
+    """Builds new instances of all sound effects configured for a wingman."""
     sound_effects_config = config.get("sound", {}).get("effects", [])
     if not sound_effects_config or len(sound_effects_config) == 0:
         return []
 
     sound_effects = []
 
-    mapping = {
-        "ROBOT": SoundEffects.ROBOT.value,
-        "RADIO": SoundEffects.RADIO.value,
-        "INTERIOR_HELMET": SoundEffects.INTERIOR_HELMET.value,
-        "INTERIOR_SMALL": SoundEffects.INTERIOR_SMALL.value,
-        "INTERIOR_MEDIUM": SoundEffects.INTERIOR_MEDIUM.value,
-        "INTERIOR_LARGE": SoundEffects.INTERIOR_LARGE.value,
-    }
-
     for effect_name in sound_effects_config:
-        effect = mapping.get(effect_name)
-        if effect:
-            sound_effects.append(effect)
+        if effect_name in SoundEffects.__members__:
+            sound_effects.append(SoundEffects[effect_name].create())
         else:
             print(f"Unknown sound effect: {effect_name}")
 
     return sound_effects
+
+
+class EffectChain:
+    """All sound effects of a wingman compiled into a single Pedalboard, so that the audio is processed in one pass
+    instead of one pass (and one new array) per effect.
+
+    A chain has its own plugin instances and must only be used by one playback at a time - use an EffectChainPool to get one.
+    """
+
+    def __init__(self, config: dict, config_hash: str | None = None):
+        self.config_hash = config_hash or EffectChain.get_config_hash(config)
+
+        plugins = [
+            plugin
+            for sound_effect in get_sound_effects_from_config(config)
+            for plugin in sound_effect
+        ]
+        self.board = Pedalboard(plugins) if plugins else None
+        self.play_beep = config.get("sound", {}).get("play_beep", False)
+
+    @staticmethod
+    def get_config_hash(config: dict) -> str:
+        return json.dumps(config.get("sound", {}), sort_keys=True, default=str)
+
+    def process(
+        self, audio: np.ndarray, sample_rate: int, reset: bool = True
+    ) -> np.ndarray:
+        """Applies the effects to the audio.
+
+        Args:
+            audio (np.ndarray): The audio to process.
+            sample_rate (int): The sample rate of the audio.
+            reset (bool): Clear the effects' state (e.g. reverb tails) before processing. Pass False when processing consecutive chunks of the same audio.
+        """
+        if self.board is None:
+            return audio
+        return self.board(audio, sample_rate, reset=reset)
+
+    def reset(self):
+        """Clears the state of all effects, so nothing of the last playback leaks into the next one."""
+        if self.board is not None:
+            self.board.reset()
+
+
+class EffectChainPool:
+    """Hands out effect chains for one sound config. Chains are reused across turns, and concurrent playbacks get their own chain.
+
+    Usage:
+        effect_chain = pool.get()
+        try:
+            chunk = effect_chain.process(chunk, sample_rate, reset=False)
+        finally:
+            pool.release(effect_chain)
+    """
+
+    def __init__(self, config: dict, config_hash: str | None = None):
+        self.config = config
+        self.config_hash = config_hash or EffectChain.get_config_hash(config)
+        self.idle_chains: list[EffectChain] = []
+        self.lock = threading.Lock()
+
+    def prepare(self):
+        """Compiles a chain ahead of the first playback."""
+        if not self.idle_chains:
+            self.idle_chains.append(EffectChain(self.config, self.config_hash))
+
+    def get(self) -> EffectChain:
+        """Takes a chain out of the pool. Give it back with release() when the playback is done."""
+        with self.lock:
+            if self.idle_chains:
+                return self.idle_chains.pop()
+        return EffectChain(self.config, self.config_hash)
+
+    def release(self, effect_chain: EffectChain):
+        effect_chain.reset()
+        with self.lock:
+            self.idle_chains.append(effect_chain)
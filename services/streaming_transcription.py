@@ -0,0 +1,35 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable
+
+
+class StreamingTranscription:
+    """Transcribes the segments of a recording in the background while the user is still talking.
+
+    Segments are transcribed in parallel but `result()` always returns them in the order they were added,
+    so that only the last segment is still pending when the user releases the "push-to-talk" key.
+    """
+
+    def __init__(self, transcribe: Callable[[BinaryIO], Any], max_workers: int = 2):
+        """
+        Args:
+            transcribe (Callable[[BinaryIO], Any]): Transcribes a single segment (blocking). Its return value is collected as it is.
+            max_workers (int): How many segments are transcribed at the same time.
+        """
+        self.transcribe = transcribe
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="transcription"
+        )
+        self.futures: list[Future] = []
+
+    def add_segment(self, audio_file: BinaryIO):
+        self.futures.append(self.executor.submit(self.transcribe, audio_file))
+
+    def has_segments(self) -> bool:
+        return len(self.futures) > 0
+
+    def result(self) -> list[Any]:
+        """Waits for all segments and returns their transcriptions in order."""
+        try:
+            return [future.result() for future in self.futures]
+        finally:
+            self.executor.shutdown(wait=False)
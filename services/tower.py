@@ -2,21 +2,29 @@ import copy
 from exceptions import MissingApiKeyException
 from wingmen.open_ai_wingman import OpenAiWingman
 from wingmen.wingman import Wingman
+from services.audio_mixer import AudioMixer
 from services.printr import Printr
 from services.secret_keeper import SecretKeeper
+from services.tts_cache import TtsCache
 
 
 printr = Printr()
 
 
 class Tower:
-    def __init__(self, config: dict[str, any], secret_keeper: SecretKeeper, app_root_dir: str):  # type: ignore
+    def __init__(self, config: dict[str, any], secret_keeper: SecretKeeper, app_root_dir: str, audio_mixer: AudioMixer | None = None):  # type: ignore
         self.config = config
         self.app_root_dir = app_root_dir
         self.secret_keeper = secret_keeper
+        self.audio_mixer = audio_mixer
         self.key_wingman_dict: dict[str, Wingman] = {}
         self.broken_wingmen = []
 
+        # one budget for the cache all wingmen share, so it's only read from the system config
+        TtsCache.set_max_bytes(
+            self.config.get("features", {}).get("tts_cache_size_mb", 100) * 1024 * 1024
+        )
+
         self.wingmen = self.__instantiate_wingmen()
         self.key_wingman_dict: dict[str, Wingman] = {}
         for wingman in self.wingmen:
@@ -36,6 +44,7 @@ class Tower:
                 "commands": self.config.get("commands", {}),
                 "elevenlabs": self.config.get("elevenlabs", {}),
                 "azure": self.config.get("azure", {}),
+                "local_whisper": self.config.get("local_whisper", {}),
             }
             merged_config = self.__merge_configs(global_config, wingman_config)
             class_config = merged_config.get("class")
@@ -78,6 +87,8 @@ class Tower:
                 # additional validation check if no exception was raised
                 errors = wingman.validate()
                 if not errors or len(errors) == 0:
+                    if self.audio_mixer:
+                        wingman.audio_player.mixer = self.audio_mixer
                     wingman.prepare()
                     wingmen.append(wingman)
                 else:
@@ -94,6 +105,9 @@ class Tower:
             wingman = self.key_wingman_dict.get(key.name, None)
         return wingman
 
+    def get_wingman_by_name(self, name: str) -> Wingman | None:
+        return next((wingman for wingman in self.wingmen if wingman.name == name), None)
+
     def get_wingmen(self):
         return self.wingmen
 
@@ -129,7 +143,15 @@ class Tower:
         # Start with a copy of the wingman's specific config to keep it intact.
         merged = wingman.copy()
         # Update 'openai', 'features', and 'edge_tts' sections from general config into wingman's config.
-        for key in ["sound", "openai", "features", "edge_tts", "elevenlabs", "azure"]:
+        for key in [
+            "sound",
+            "openai",
+            "features",
+            "edge_tts",
+            "elevenlabs",
+            "azure",
+            "local_whisper",
+        ]:
             if key in general:
                 # Use copy.deepcopy to ensure a full deep copy is made and original is untouched.
                 merged[key] = self.__deep_merge(
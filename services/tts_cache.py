@@ -0,0 +1,148 @@
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+from services.file_creator import FileCreator
+from services.printr import Printr
+
+CACHE_PATH = "audio_output/tts_cache"
+FILE_EXTENSION = ".npy"
+
+printr = Printr()
+
+
+@dataclass
+class CacheEntry:
+    file_path: str
+    sample_rate: int
+    size: int
+    last_used: float
+
+
+class TtsCache(FileCreator):
+    """Keeps synthesized speech on disk, so that repeated phrases (like command responses) don't have to be synthesized again.
+
+    Entries are keyed by a hash of everything that changes the audio (provider, voice, model, voice settings and text)
+    and stored as decoded samples, so that a hit can be played right away. If the cache grows beyond its byte budget,
+    the least recently used entries are deleted.
+
+    The index and the byte budget are shared by all wingmen of the process.
+    """
+
+    _entries: dict[str, CacheEntry] = {}
+    _loaded = False
+    _lock = threading.Lock()
+    max_bytes = 100 * 1024 * 1024
+    hits = 0
+    misses = 0
+
+    def __init__(self, app_root_dir: str):
+        super().__init__(app_root_dir, CACHE_PATH)
+
+        with TtsCache._lock:
+            if not TtsCache._loaded:
+                TtsCache._entries.update(self.__load_entries())
+                TtsCache._loaded = True
+
+    @staticmethod
+    def set_max_bytes(max_bytes: int):
+        """Sets the byte budget of the whole cache (not per wingman). Entries beyond it are evicted with the next put()."""
+        with TtsCache._lock:
+            TtsCache.max_bytes = max_bytes
+
+    @staticmethod
+    def get_key(
+        provider: str, voice: str, model: str, settings: dict | None, text: str
+    ) -> str:
+        key_data = json.dumps(
+            [provider, voice, model, settings or {}, text],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(key_data.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, count: bool = True) -> tuple[np.ndarray, int] | None:
+        """Returns the cached audio and its sample rate, or None if it isn't cached.
+
+        Args:
+            key (str): The key from get_key().
+            count (bool): Count this as hit or miss in the stats.
+        """
+        with TtsCache._lock:
+            entry = TtsCache._entries.get(key)
+            if entry is None:
+                TtsCache.misses += count
+                return None
+
+            try:
+                audio = np.load(entry.file_path)
+            except (OSError, ValueError):
+                # deleted or broken on disk
+                del TtsCache._entries[key]
+                TtsCache.misses += count
+                return None
+
+            TtsCache.hits += count
+            entry.last_used = self.__touch(entry.file_path)
+            return audio, entry.sample_rate
+
+    def put(self, key: str, audio: np.ndarray, sample_rate: int):
+        file_path = self.get_full_file_path(
+            f"{key}.{int(sample_rate)}{FILE_EXTENSION}"
+        )
+        with TtsCache._lock:
+            try:
+                np.save(file_path, audio)
+            except OSError as e:
+                printr.print_warn(f"Could not write to the TTS cache: {e}")
+                return
+
+            size = os.path.getsize(file_path)
+            TtsCache._entries[key] = CacheEntry(
+                file_path, int(sample_rate), size, self.__touch(file_path)
+            )
+            self.__evict()
+
+    def get_stats(self) -> str:
+        with TtsCache._lock:
+            size = sum(entry.size for entry in TtsCache._entries.values())
+            return f"hits: {TtsCache.hits}, misses: {TtsCache.misses}, {len(TtsCache._entries)} entries, {size / 1024 / 1024:.1f} MB"
+
+    def __evict(self):
+        size = sum(entry.size for entry in TtsCache._entries.values())
+        if size <= TtsCache.max_bytes:
+            return
+
+        for key, entry in sorted(
+            TtsCache._entries.items(), key=lambda item: item[1].last_used
+        ):
+            if size <= TtsCache.max_bytes:
+                break
+            try:
+                os.remove(entry.file_path)
+            except OSError:
+                pass
+            size -= entry.size
+            del TtsCache._entries[key]
+
+    def __load_entries(self) -> dict[str, CacheEntry]:
+        entries = {}
+        for file_name in os.listdir(self.file_dir):
+            key, _, rest = file_name.partition(".")
+            sample_rate = rest.removesuffix(FILE_EXTENSION)
+            if not rest.endswith(FILE_EXTENSION) or not sample_rate.isdigit():
+                continue
+
+            file_path = self.get_full_file_path(file_name)
+            stat = os.stat(file_path)
+            entries[key] = CacheEntry(
+                file_path, int(sample_rate), stat.st_size, stat.st_mtime
+            )
+        return entries
+
+    def __touch(self, file_path: str) -> float:
+        """Marks the file as used (by its modification time), so the LRU order survives restarts."""
+        os.utime(file_path)
+        return os.path.getmtime(file_path)
@@ -0,0 +1,210 @@
+import numpy
+from services.audio_buffer import RecordingBuffer, RingBuffer
+
+FRAME_MS = 20
+"""The length of the frames the audio is split into for the voice activity detection."""
+
+
+def get_frame_levels(audio: numpy.ndarray, samplerate: int) -> tuple[numpy.ndarray, int]:
+    """Calculates the RMS level (in dBFS) of consecutive frames of the given audio.
+
+    Args:
+        audio (numpy.ndarray): The audio (shape: frames or frames x channels). Multiple channels are downmixed.
+        samplerate (int): The sample rate of the audio.
+
+    Returns:
+        tuple[numpy.ndarray, int]: The level of each complete frame and the frame length in samples.
+    """
+    frame_length = max(1, samplerate * FRAME_MS // 1000)
+    mono = audio.mean(axis=1) if audio.ndim > 1 else audio
+    frame_count = len(mono) // frame_length
+
+    frames = mono[: frame_count * frame_length].reshape(frame_count, frame_length)
+    rms = numpy.sqrt(numpy.mean(numpy.square(frames, dtype=numpy.float64), axis=1))
+    levels = 20 * numpy.log10(numpy.maximum(rms, 1e-10))
+
+    return levels, frame_length
+
+
+def get_speech_mask(
+    levels: numpy.ndarray, threshold_db: float, padding_frames: int = 0
+) -> numpy.ndarray:
+    """Marks all frames louder than the threshold as speech and extends each speech region by `padding_frames`
+    in both directions, so that soft word onsets and endings are kept.
+    """
+    mask = levels > threshold_db
+    if padding_frames > 0 and mask.any():
+        kernel = numpy.ones(2 * padding_frames + 1, dtype=int)
+        mask = numpy.convolve(mask.astype(int), kernel, mode="same") > 0
+    return mask
+
+
+def trim_silence(
+    audio: numpy.ndarray,
+    samplerate: int,
+    threshold_db: float = -45,
+    max_pause_ms: int = 1000,
+    min_speech_ms: int = 100,
+    padding_ms: int = 100,
+) -> numpy.ndarray | None:
+    """Removes leading and trailing silence and shortens internal pauses to `max_pause_ms`.
+
+    Args:
+        audio (numpy.ndarray): The audio to trim (shape: frames or frames x channels).
+        samplerate (int): The sample rate of the audio.
+        threshold_db (float): Frames below this level (in dBFS) are considered silence.
+        max_pause_ms (int): Pauses between speech longer than this are shortened to this length.
+        min_speech_ms (int): If there is less speech than this in the audio, it's considered silent.
+        padding_ms (int): Silence kept around each speech region.
+
+    Returns:
+        numpy.ndarray | None: The trimmed audio or None if the audio contains no speech at all.
+    """
+    levels, frame_length = get_frame_levels(audio, samplerate)
+    if len(levels) == 0:
+        return None
+
+    if numpy.count_nonzero(levels > threshold_db) * FRAME_MS < min_speech_ms:
+        return None
+
+    keep = get_speech_mask(levels, threshold_db, padding_ms // FRAME_MS)
+
+    # find the silent runs between speech and only keep the first `max_pause_frames` of them
+    max_pause_frames = max(0, max_pause_ms // FRAME_MS)
+    edges = numpy.diff(numpy.concatenate(([1], keep.astype(int), [1])))
+    pause_starts = numpy.flatnonzero(edges == -1)
+    pause_ends = numpy.flatnonzero(edges == 1)
+    for start, end in zip(pause_starts, pause_ends):
+        if start == 0 or end == len(keep):
+            continue  # leading or trailing silence is removed completely
+        keep[start : start + max_pause_frames] = True
+
+    sample_mask = numpy.repeat(keep, frame_length)
+    return audio[: len(sample_mask)][sample_mask]
+
+
+class VoiceActivitySegmenter:
+    """Cuts a continuous audio stream into utterances for hands-free voice activation.
+
+    Feed it the frames of the input stream with `process()`. Memory usage is bounded:
+    audio is only kept for the current utterance (up to `max_utterance_seconds`)
+    and for a short pre-roll before speech is detected.
+    """
+
+    def __init__(
+        self,
+        samplerate: int,
+        channels: int = 1,
+        threshold_db: float = -40,
+        hangover_ms: int = 800,
+        min_speech_ms: int = 300,
+        pre_speech_ms: int = 300,
+        max_utterance_seconds: float = 30,
+    ):
+        """
+        Args:
+            samplerate (int): The sample rate of the input stream.
+            channels (int): The number of channels of the input stream.
+            threshold_db (float): Frames louder than this (in dBFS) are considered speech.
+            hangover_ms (int): How long it has to be silent before an utterance ends.
+            min_speech_ms (int): Utterances with less speech than this are dropped (coughs, clicks etc.).
+            pre_speech_ms (int): How much audio before the detected speech is added to the utterance.
+            max_utterance_seconds (float): Utterances are cut after this length, even if the speaker doesn't pause.
+        """
+        self.samplerate = samplerate
+        self.channels = channels
+        self.threshold_db = threshold_db
+        self.hangover_frames = max(1, hangover_ms // FRAME_MS)
+        self.min_speech_frames = max(1, min_speech_ms // FRAME_MS)
+        self.max_utterance_frames = int(max_utterance_seconds * samplerate)
+        self.frame_length = max(1, samplerate * FRAME_MS // 1000)
+
+        self.pre_speech = RingBuffer(samplerate, channels, pre_speech_ms / 1000)
+        self.utterance = RecordingBuffer(
+            samplerate, channels, preallocated_seconds=max_utterance_seconds
+        )
+        self.pending = numpy.empty((0, channels), dtype=numpy.float32)
+        """Frames that didn't fill a complete analysis frame yet."""
+
+        self.in_speech = False
+        self.speech_frames = 0
+        self.silent_frames = 0
+
+    def reset(self):
+        """Drops the current utterance, e.g. because push-to-talk took over."""
+        self.pre_speech.clear()
+        self.utterance.clear()
+        self.pending = self.pending[:0]
+        self.in_speech = False
+        self.speech_frames = 0
+        self.silent_frames = 0
+
+    def process(self, data: numpy.ndarray) -> list[numpy.ndarray]:
+        """Analyzes the next frames of the stream.
+
+        Args:
+            data (numpy.ndarray): The next frames of the input stream (shape: frames x channels).
+
+        Returns:
+            list[numpy.ndarray]: The utterances that ended within the given frames, usually none.
+        """
+        if len(self.pending) > 0:
+            data = numpy.concatenate((self.pending, data))
+
+        frame_count = len(data) // self.frame_length
+        complete = frame_count * self.frame_length
+        self.pending = data[complete:].copy()
+        if frame_count == 0:
+            return []
+
+        levels, _ = get_frame_levels(data[:complete], self.samplerate)
+        utterances = []
+
+        for index, level in enumerate(levels):
+            frame = data[index * self.frame_length : (index + 1) * self.frame_length]
+            is_speech = level > self.threshold_db
+
+            if not self.in_speech:
+                if not is_speech:
+                    self.pre_speech.append(frame)
+                    continue
+                self.in_speech = True
+                self.utterance.append(self.pre_speech.read())
+                self.pre_speech.clear()
+
+            self.utterance.append(frame)
+            if is_speech:
+                self.speech_frames += 1
+                self.silent_frames = 0
+            else:
+                self.silent_frames += 1
+
+            if (
+                self.silent_frames >= self.hangover_frames
+                or len(self.utterance) >= self.max_utterance_frames
+            ):
+                utterance = self.utterance.get_audio()
+                if self.speech_frames >= self.min_speech_frames:
+                    utterances.append(utterance)
+                self.in_speech = False
+                self.speech_frames = 0
+                self.silent_frames = 0
+
+        return utterances
+
+    def flush(self) -> numpy.ndarray | None:
+        """Ends the current utterance, e.g. because the recording was stopped.
+
+        Returns:
+            numpy.ndarray | None: The unfinished utterance or None if there was no (long enough) speech.
+        """
+        utterance = None
+        if self.in_speech:
+            if len(self.pending) > 0:
+                self.utterance.append(self.pending)
+            audio = self.utterance.get_audio()
+            if self.speech_frames >= self.min_speech_frames:
+                utterance = audio
+
+        self.reset()
+        return utterance
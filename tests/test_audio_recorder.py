@@ -0,0 +1,49 @@
+import numpy
+import pytest
+import soundfile
+
+try:
+    from services.audio_recorder import AudioRecorder
+except OSError:  # sounddevice without PortAudio
+    pytest.skip("PortAudio is not available", allow_module_level=True)
+
+
+def create_recorder(samplerate: int) -> AudioRecorder:
+    # without opening the input stream
+    recorder = AudioRecorder.__new__(AudioRecorder)
+    recorder.samplerate = samplerate
+    recorder.channels = 1
+    return recorder
+
+
+def encode(recorder: AudioRecorder, features: dict):
+    t = numpy.arange(recorder.samplerate) / recorder.samplerate
+    recording = (0.3 * numpy.sin(2 * numpy.pi * 440 * t)).astype(numpy.float32)
+    # pylint: disable=protected-access
+    return recorder._AudioRecorder__encode_for_upload(recording[:, None], features)
+
+
+@pytest.mark.parametrize(
+    "upload_samplerate, expected_samplerate",
+    [(0, 48000), (44100, 48000), (22050, 24000), (16000, 16000)],
+)
+def test_ogg_upload_uses_an_opus_samplerate(upload_samplerate, expected_samplerate):
+    audio_file = encode(
+        create_recorder(44100),
+        {"stt_upload_format": "ogg", "stt_upload_samplerate": upload_samplerate},
+    )
+
+    assert audio_file.name == "recording.ogg"
+    audio, samplerate = soundfile.read(audio_file)
+    assert samplerate == expected_samplerate
+    assert len(audio) == pytest.approx(expected_samplerate, rel=0.01)
+
+
+def test_flac_upload_keeps_the_original_samplerate():
+    audio_file = encode(
+        create_recorder(44100),
+        {"stt_upload_format": "flac", "stt_upload_samplerate": 0},
+    )
+
+    assert audio_file.name == "recording.flac"
+    assert soundfile.info(audio_file).samplerate == 44100
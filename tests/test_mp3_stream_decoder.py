@@ -0,0 +1,58 @@
+import io
+import numpy
+import pytest
+import soundfile
+from services.mp3_stream_decoder import Mp3StreamDecoder
+
+
+def create_mp3(samplerate: int, bitrate_mode: str) -> bytes:
+    t = numpy.arange(samplerate * 3) / samplerate
+    noise = numpy.random.default_rng(0).standard_normal(len(t))
+    # alternating tone and noise, so a variable bitrate really varies
+    audio = 0.3 * numpy.sin(2 * numpy.pi * 220 * t) + 0.2 * noise * (t % 1 > 0.5)
+    mp3 = io.BytesIO()
+    soundfile.write(
+        mp3,
+        audio.astype(numpy.float32),
+        samplerate,
+        format="MP3",
+        bitrate_mode=bitrate_mode,
+        compression_level=0.5,
+    )
+    return mp3.getvalue()
+
+
+def decode(data: bytes, piece_bytes: int) -> tuple[numpy.ndarray, Mp3StreamDecoder]:
+    decoder = Mp3StreamDecoder()
+    pieces = [
+        decoder.feed(data[start : start + piece_bytes])
+        for start in range(0, len(data), piece_bytes)
+    ]
+    pieces.append(decoder.flush())
+    return numpy.concatenate(pieces), decoder
+
+
+def assert_matches_file_decode(audio: numpy.ndarray, data: bytes):
+    # the file decode trims the encoder delay, the stream decode can't
+    expected, _samplerate = soundfile.read(io.BytesIO(data), dtype="float32")
+    window = expected[:2000]
+    delay = min(
+        range(len(audio) - len(expected) + 1),
+        key=lambda start: numpy.abs(audio[start : start + len(window)] - window).max(),
+    )
+    numpy.testing.assert_allclose(
+        audio[delay : delay + len(expected)], expected, atol=1e-6
+    )
+
+
+@pytest.mark.parametrize("samplerate", [16000, 22050, 24000, 44100, 48000])
+@pytest.mark.parametrize("bitrate_mode", ["CONSTANT", "VARIABLE"])
+@pytest.mark.parametrize("piece_bytes", [777, None])
+def test_decodes_every_frame(samplerate, bitrate_mode, piece_bytes):
+    data = create_mp3(samplerate, bitrate_mode)
+
+    audio, decoder = decode(data, piece_bytes or len(data))
+
+    assert decoder.samplerate == samplerate
+    assert len(audio) == decoder.frames_parsed * decoder.samples_per_frame
+    assert_matches_file_decode(audio, data)
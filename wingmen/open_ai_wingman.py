@@ -1,6 +1,16 @@
+import asyncio
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+import copy
+import itertools
 import json
-from typing import Mapping
+import queue
+import threading
+import time
+from typing import AsyncIterator, BinaryIO, Callable, Iterator, Mapping
 import azure.cognitiveservices.speech as speechsdk
+import numpy as np
 from elevenlabslib import (
     ElevenLabsUser,
     GenerationOptions,
@@ -10,14 +20,28 @@ from elevenlabslib import (
     ElevenLabsClonedVoice,
     ElevenLabsProfessionalVoice,
 )
-from services.open_ai import AzureConfig, OpenAi
+from services.open_ai import AzureConfig, OpenAi, PCM_SAMPLERATE as OPENAI_PCM_SAMPLERATE
 from services.edge import EdgeTTS
+from services.local_whisper import LocalWhisper
 from services.printr import Printr
+from services.resampler import resample
 from services.secret_keeper import SecretKeeper
+from services.sentence_splitter import split_sentences
+from services.streaming_transcription import StreamingTranscription
+from services.tts_cache import TtsCache
 from wingmen.wingman import Wingman
 
 printr = Printr()
 
+AZURE_PCM_SAMPLERATE = 24000
+"""Matches the Raw24Khz16BitMonoPcm output format we request from Azure."""
+AZURE_STREAM_CHUNK_BYTES = 4800
+"""100ms of Raw24Khz16BitMonoPcm audio."""
+ELEVENLABS_STREAM_FORMAT = "pcm_24000"
+"""Raw PCM (available on all subscriptions), so the streamed chunks don't have to be decoded."""
+ELEVENLABS_STREAM_TIMEOUT = 30
+"""Seconds to wait for the next streamed chunk before giving up, e.g. if the request failed."""
+
 
 class OpenAiWingman(Wingman):
     """Our OpenAI Wingman base gives you everything you need to interact with OpenAI's various APIs.
@@ -48,9 +72,19 @@ class OpenAiWingman(Wingman):
         ]
         """The conversation history that is used for the GPT calls"""
 
-        self.edge_tts = EdgeTTS(app_root_dir)
+        self.edge_tts = EdgeTTS(app_root_dir, owner=name)
+        self.local_whisper: LocalWhisper = None  # validate will set this
         self.last_transcript_locale = None
         self.elevenlabs_api_key = None
+        self.elevenlabs_voice: tuple[str, object, GenerationOptions] | None = None
+        """The config hash, resolved voice and generation options, reused for every response until the config changes."""
+        self.elevenlabs_lock = threading.Lock()
+        self.azure_synthesizers: list[
+            tuple[str, speechsdk.SpeechSynthesizer, speechsdk.Connection]
+        ] = []
+        """Idle synthesizers with their config hash and open connection, reused until the config changes.
+        A synthesizer handles one text at a time, so sentences synthesized at the same time (tts_lookahead) each take their own."""
+        self.azure_lock = threading.Lock()
         self.azure_keys = {
             "tts": None,
             "whisper": None,
@@ -86,8 +120,77 @@ class OpenAiWingman(Wingman):
 
         self.__validate_azure_config(errors)
 
+        self.__validate_local_whisper_config(errors)
+
         return errors
 
+    def prepare(self):
+        super().prepare()
+
+        if self.local_whisper:
+            printr.print(f"Warming up local Whisper for {self.name}...", tags="info")
+            self.local_whisper.start_warm_up(self.name)
+
+        if self.tts_provider == "elevenlabs":
+            # API calls, so they must not block the startup. A response that comes earlier waits for the lock.
+            self.__warm_up_in_background(
+                "elevenlabs", "load the ElevenLabs voice", self.__get_elevenlabs_voice
+            )
+
+        if self.tts_provider == "azure":
+            # connects one synthesizer, more are added when sentences are synthesized at the same time.
+            # Only opening its connection is asynchronous in the SDK, creating it blocks as well.
+            self.__warm_up_in_background(
+                "azure-tts", "connect to Azure TTS", self.__connect_idle_azure_synthesizer
+            )
+
+    def __warm_up_in_background(
+        self, name: str, description: str, warm_up: Callable[[], object]
+    ) -> threading.Thread:
+        """Runs warm_up in a daemon thread, like LocalWhisper.start_warm_up. Errors are only printed as a warning,
+        the next response tries again.
+
+        Args:
+            name (str): Used in the name of the thread.
+            description (str): What is warmed up, used in the warning, like "load the ElevenLabs voice".
+            warm_up (Callable[[], object]): The (blocking) warm-up.
+
+        Returns:
+            threading.Thread: The background thread.
+        """
+
+        def run():
+            try:
+                warm_up()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                printr.print_warn(f"Could not {description} for {self.name}: {e}")
+
+        thread = threading.Thread(
+            target=run, name=f"{name}-warm-up-{self.name}", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def __validate_local_whisper_config(self, errors):
+        if self.stt_provider != "local":
+            return
+
+        if not LocalWhisper.is_available():
+            errors.append(
+                "The 'local' stt_provider requires the 'faster-whisper' package. Install it with 'pip install faster-whisper' or use another stt_provider."
+            )
+            return
+
+        local_whisper_settings = self.config.get("local_whisper", {})
+        self.local_whisper = LocalWhisper(
+            self.app_root_dir,
+            model=local_whisper_settings.get("model", "base"),
+            compute_type=local_whisper_settings.get("compute_type", "int8"),
+            cpu_threads=local_whisper_settings.get("cpu_threads", 0),
+            beam_size=local_whisper_settings.get("beam_size", 1),
+            language=local_whisper_settings.get("language"),
+        )
+
     def __validate_elevenlabs_config(self, errors):
         if self.tts_provider == "elevenlabs":
             self.elevenlabs_api_key = self.secret_keeper.retrieve(
@@ -187,35 +290,35 @@ class OpenAiWingman(Wingman):
                 )
                 return
 
-    async def _transcribe(self, audio_input_wav: str) -> tuple[str | None, str | None]:
-        """Transcribes the recorded audio to text using the OpenAI Whisper API.
+    async def _transcribe(
+        self, audio_input_wav: str | BinaryIO | StreamingTranscription
+    ) -> tuple[str | None, str | None]:
+        """Transcribes the recorded audio to text using the OpenAI Whisper API (or a local Whisper model if stt_provider is 'local').
 
         Args:
-            audio_input_wav (str): The path to the audio file that contains the user's speech. This is a recording of what you you said.
+            audio_input_wav (str | BinaryIO | StreamingTranscription): The in-memory audio file (or the path to an audio file) that contains the user's speech. This is a recording of what you you said. Or the StreamingTranscription started in start_streaming_transcription().
 
         Returns:
             str | None: The transcript of the audio file or None if the transcription failed.
         """
-        detect_language = self.config["edge_tts"].get("detect_language")
+        params = self.__get_transcription_params()
 
-        response_format = (
-            "verbose_json"  # verbose_json will return the language detected in the transcript.
-            if self.tts_provider == "edge_tts" and detect_language
-            else "json"
-        )
-
-        azure_config = None
-        if self.stt_provider == "azure":
-            azure_config = self._get_azure_config("whisper")
-
-        transcript = self.openai.transcribe(
-            audio_input_wav, response_format=response_format, azure_config=azure_config
-        )
+        if isinstance(audio_input_wav, StreamingTranscription):
+            # all segments but the last one should be done by now
+            segments = await asyncio.get_running_loop().run_in_executor(
+                None, audio_input_wav.result
+            )
+            segments = [segment for segment in segments if segment and segment.text]
+            transcript = segments[-1] if segments else None
+            text = " ".join(segment.text.strip() for segment in segments)
+        else:
+            transcript = self.__transcribe_with_provider(audio_input_wav, params)
+            text = transcript.text if transcript else None
 
         locale = None
         # skip the GPT call if we didn't change the language
         if (
-            response_format == "verbose_json"
+            params["response_format"] == "verbose_json"
             and transcript
             and transcript.language != self.last_transcript_locale  # type: ignore
         ):
@@ -224,7 +327,39 @@ class OpenAiWingman(Wingman):
             )
             locale = self.__ask_gpt_for_locale(transcript.language)  # type: ignore
 
-        return transcript.text if transcript else None, locale
+        return text or None, locale
+
+    def start_streaming_transcription(self) -> StreamingTranscription | None:
+        """Transcribes the recording in segments while the user is still talking if `stt_streaming` is enabled in the features."""
+        if not self.config["features"].get("stt_streaming", False):
+            return None
+
+        params = self.__get_transcription_params()
+        return StreamingTranscription(
+            lambda audio_file: self.__transcribe_with_provider(audio_file, params)
+        )
+
+    def __transcribe_with_provider(
+        self, audio_input: str | BinaryIO, params: dict[str, any]
+    ):
+        if self.stt_provider == "local":
+            return self.local_whisper.transcribe(audio_input)
+        return self.openai.transcribe(audio_input, **params)
+
+    def __get_transcription_params(self) -> dict[str, any]:
+        detect_language = self.config["edge_tts"].get("detect_language")
+
+        response_format = (
+            "verbose_json"  # verbose_json will return the language detected in the transcript. The local provider always does.
+            if self.tts_provider == "edge_tts" and detect_language
+            else "json"
+        )
+
+        azure_config = None
+        if self.stt_provider == "azure":
+            azure_config = self._get_azure_config("whisper")
+
+        return {"response_format": response_format, "azure_config": azure_config}
 
     def _get_azure_config(self, section: str):
         azure_api_key = self.azure_keys[section]
@@ -492,43 +627,401 @@ class OpenAiWingman(Wingman):
             # if the command has responses, we have to play one of them
             if command and command.get("responses"):
                 instant_reponse = self._select_command_response(command)
-                await self._play_to_user(instant_reponse)
+                await self._play_to_user(instant_reponse, cacheable=True)
 
         return function_response, instant_reponse
 
-    async def _play_to_user(self, text: str):
+    async def _play_to_user(self, text: str, cacheable: bool = False):
         """Plays audio to the user using the configured TTS Provider (default: OpenAI TTS).
         Also adds sound effects if enabled in the configuration.
 
         Args:
             text (str): The text to play as audio.
+            cacheable (bool): True if the text is a fixed phrase (e.g. a command response), so it's taken from and put into the TTS cache.
+        """
+
+        if self.tts_provider == "elevenlabs" and not self.config["elevenlabs"].get(
+            "use_sound_effects", False
+        ):
+            # ElevenLabs streams and plays this itself, so there's nothing we could cache
+            self._play_with_elevenlabs(text)
+            return
+
+        sentences = (
+            split_sentences(text)
+            if self.config["features"].get("tts_pipelining", True)
+            else [text]
+        )
+        if len(sentences) > 1:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.__play_pipelined, sentences, cacheable
+            )
+            return
+
+        if self.tts_provider == "edge_tts":
+            await self.__play_stream(text, self.edge_tts.stream_speech, cacheable)
+            return
+
+        if self.tts_provider == "elevenlabs":
+            await self.__play_stream(text, self.__stream_elevenlabs, cacheable)
+            return
+
+        if self.tts_provider == "azure":
+            await self.__play_stream(text, self.__stream_azure, cacheable)
+            return
+
+        audio = await self._synthesize(text, cacheable=cacheable)
+        if audio is not None:
+            self.audio_player.stream_with_effects(audio, self.config)
+
+    async def __play_stream(
+        self,
+        text: str,
+        get_chunks: Callable[
+            [str, str | None],
+            Iterator[tuple[np.ndarray, int]] | AsyncIterator[tuple[np.ndarray, int]],
+        ],
+        cacheable: bool,
+    ):
+        """Plays the audio of a streaming TTS Provider while it's still arriving, without waiting for the whole response.
+        If it's cacheable, the complete audio is put into the TTS cache afterwards, and a cached response is played right away.
+
+        Args:
+            text (str): The text to play as audio.
+            get_chunks (Callable): Gets the text and voice and returns the (audio, sample rate) chunks, as iterator or async iterator.
+                A (blocking) iterator is run in a worker thread.
+            cacheable (bool): False if the text is unlikely to be said again (e.g. an AI response).
+        """
+        voice = await self._get_tts_voice()
+        cache_key, audio = self.__get_cached_speech(text, voice, cacheable=cacheable)
+        if audio is not None:
+            self.audio_player.stream_with_effects(audio, self.config)
+            return
+
+        chunks = get_chunks(text, voice)
+        if not isinstance(chunks, AsyncIterator):
+            chunks = self.__iterate_in_thread(chunks)
+
+        stream = None
+        audio_chunks = []
+        try:
+            async for chunk, sample_rate in chunks:
+                if stream is None:
+                    stream = self.audio_player.start_stream_with_effects(
+                        sample_rate, self.config
+                    )
+                stream.write(chunk)
+                audio_chunks.append(chunk)
+        finally:
+            if stream:
+                stream.finish()
+
+        if audio_chunks and cache_key:
+            self.tts_cache.put(
+                cache_key, np.concatenate(audio_chunks), stream.sample_rate
+            )
+
+    async def __iterate_in_thread(
+        self, chunks: Iterator[tuple[np.ndarray, int]]
+    ) -> AsyncIterator[tuple[np.ndarray, int]]:
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    def __stream_elevenlabs(
+        self, text: str, _voice: str | None
+    ) -> Iterator[tuple[np.ndarray, int]]:
+        voice, generation_options = self.__get_elevenlabs_voice()
+        generation_options = copy.copy(generation_options)
+        generation_options.output_format = ELEVENLABS_STREAM_FORMAT
+        audio_queue, _transcript_queue = voice.stream_audio_no_playback(
+            prompt=text, generationOptions=generation_options
+        )
+
+        sample_rate = int(ELEVENLABS_STREAM_FORMAT.split("_")[1])
+        while True:
+            try:
+                # float32 samples with one column, None marks the end
+                chunk = audio_queue.get(timeout=ELEVENLABS_STREAM_TIMEOUT)
+            except queue.Empty as e:
+                raise TimeoutError("ElevenLabs stopped sending audio.") from e
+            if chunk is None:
+                return
+            yield chunk.reshape(-1), sample_rate
+
+    def __stream_azure(
+        self, text: str, _voice: str | None
+    ) -> Iterator[tuple[np.ndarray, int]]:
+        with self.__azure_synthesizer() as speech_synthesizer:
+            if speech_synthesizer is None:
+                return
+
+            # returns as soon as the synthesis started
+            result = speech_synthesizer.start_speaking_text_async(text).get()
+            audio_data_stream = speechsdk.AudioDataStream(result)
+            yield from self.__read_azure_stream(audio_data_stream)
+
+    def __read_azure_stream(
+        self, audio_data_stream: speechsdk.AudioDataStream
+    ) -> Iterator[tuple[np.ndarray, int]]:
+        pending = b""
+        buffer = bytes(AZURE_STREAM_CHUNK_BYTES)
+        while True:
+            # blocks until there is audio or the synthesis is done
+            filled = audio_data_stream.read_data(buffer)
+            if filled == 0:
+                break
+            # the samples are 16 bit, so keep an odd byte for the next chunk
+            pcm = pending + buffer[:filled]
+            pending = pcm[len(pcm) - len(pcm) % 2 :]
+            yield self.audio_player.get_audio_from_pcm(pcm), AZURE_PCM_SAMPLERATE
+
+        if audio_data_stream.status == speechsdk.StreamStatus.Canceled:
+            details = audio_data_stream.cancellation_details
+            raise RuntimeError(f"Azure TTS failed: {details.error_details}")
+
+    def __play_pipelined(self, sentences: list[str], cacheable: bool):
+        """Synthesizes the sentences in the background (a few ahead of the one that is played) and plays them in order as one playback.
+        So the playback starts as soon as the first sentence is ready, not when the whole response is."""
+        lookahead = max(1, self.config["features"].get("tts_lookahead", 2))
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(
+            max_workers=lookahead,
+            thread_name_prefix=f"tts-{self.name}",
+        ) as executor:
+            remaining = iter(sentences)
+            queued: deque[Future] = deque()
+
+            def queue_next():
+                sentence = next(remaining, None)
+                if sentence:
+                    # each worker runs its own event loop, so async providers don't block each other
+                    queued.append(
+                        executor.submit(
+                            asyncio.run,
+                            self._synthesize(sentence, cacheable=cacheable),
+                        )
+                    )
+
+            def synthesized_in_order():
+                while queued:
+                    audio = queued.popleft().result()
+                    queue_next()
+                    if audio is not None:
+                        yield audio
+
+            for _ in range(lookahead):
+                queue_next()
+
+            results = synthesized_in_order()
+            first = next(results, None)
+            if first is None:
+                return
+
+            _first_audio, sample_rate = first
+            if self.debug:
+                printr.print(
+                    f"   First of {len(sentences)} sentences synthesized after {(time.perf_counter() - start) * 1000:.0f}ms",
+                    tags="info",
+                )
+
+            def chunks():
+                for audio, audio_sample_rate in itertools.chain([first], results):
+                    if audio_sample_rate != sample_rate:
+                        # e.g. a cached sentence from before the provider changed its output format
+                        audio = resample(
+                            self.audio_player.to_float32(audio),
+                            audio_sample_rate,
+                            sample_rate,
+                        )
+                    yield from self.audio_player.get_chunks(audio, sample_rate)
+
+            self.audio_player.stream_chunks_with_effects(
+                chunks(), sample_rate, self.config
+            )
+
+    async def _synthesize(
+        self, text: str, prefetch: bool = False, cacheable: bool = True
+    ) -> tuple[np.ndarray, int] | None:
+        """Synthesizes the text with the configured TTS Provider, or gets it from the TTS cache.
+
+        Args:
+            text (str): The text to synthesize.
+            prefetch (bool): True if the audio is synthesized ahead of time, so it doesn't count as a cache hit or miss.
+            cacheable (bool): False if the text is unlikely to be said again (e.g. an AI response), so the TTS cache isn't used.
+
+        Returns:
+            tuple[np.ndarray, int] | None: The audio and its sample rate, or None if the synthesis failed.
         """
+        voice = await self._get_tts_voice()
+
+        cache_key, audio = self.__get_cached_speech(text, voice, prefetch, cacheable)
+        if audio is not None:
+            return audio
 
         if self.tts_provider == "edge_tts":
-            await self._play_with_edge_tts(text)
+            audio = await self._synthesize_with_edge_tts(text, voice)
         elif self.tts_provider == "elevenlabs":
-            self._play_with_elevenlabs(text)
+            audio = self._synthesize_with_elevenlabs(text)
         elif self.tts_provider == "azure":
-            self._play_with_azure(text)
+            audio = self._synthesize_with_azure(text)
         else:
-            self._play_with_openai(text)
+            audio = self._synthesize_with_openai(text)
+
+        if audio is not None and cache_key:
+            self.tts_cache.put(cache_key, *audio)
+        return audio
+
+    def __get_cached_speech(
+        self, text: str, voice: str, prefetch: bool = False, cacheable: bool = True
+    ) -> tuple[str | None, tuple[np.ndarray, int] | None]:
+        """Looks the text up in the TTS cache.
+
+        Returns:
+            tuple[str | None, tuple[np.ndarray, int] | None]: The cache key (None if the cache is disabled or the text isn't cacheable) and the cached audio with its sample rate (None if not cached).
+        """
+        if not self.tts_cache or not cacheable:
+            return None, None
+
+        cache_key = TtsCache.get_key(
+            self.tts_provider, voice, *self.__get_tts_model_and_settings(), text
+        )
+        audio = self.tts_cache.get(cache_key, count=not prefetch)
+        if self.debug and not prefetch:
+            printr.print(
+                f"   TTS cache {'miss' if audio is None else 'hit'} ({self.tts_cache.get_stats()})",
+                tags="info",
+            )
+        return cache_key, audio
+
+    def _get_presynthesis_texts(self) -> list[str]:
+        if self.tts_provider == "edge_tts" and self.config["edge_tts"].get(
+            "detect_language"
+        ):
+            # the voice depends on the language the user speaks, so we can't know it ahead of time
+            return []
+        if self.tts_provider == "elevenlabs" and not self.config["elevenlabs"].get(
+            "use_sound_effects", False
+        ):
+            # streamed directly and not cached
+            return []
+        return super()._get_presynthesis_texts()
+
+    async def _get_tts_voice(self) -> str | None:
+        """Returns the voice the configured TTS Provider will use for the next response."""
+        if self.tts_provider == "edge_tts":
+            edge_config = self.config["edge_tts"]
+            if edge_config.get("detect_language"):
+                return await self.edge_tts.get_same_random_voice_for_language(
+                    edge_config.get("gender"), self.last_transcript_locale
+                )
+            return edge_config.get("tts_voice")
+        if self.tts_provider == "elevenlabs":
+            voice_config = self.config["elevenlabs"]["voice"]
+            return voice_config.get("id") or voice_config.get("name")
+        if self.tts_provider == "azure":
+            return self.config["azure"].get("tts", {}).get("voice")
+        return self.config["openai"].get("tts_voice")
 
-    def _play_with_openai(self, text):
-        response = self.openai.speak(text, self.config["openai"].get("tts_voice"))
-        if response is not None:
-            self.audio_player.stream_with_effects(response.content, self.config)
+    def __get_tts_model_and_settings(self) -> tuple[str | None, dict | None]:
+        """Everything besides the voice and text that changes how the TTS Provider sounds."""
+        if self.tts_provider == "elevenlabs":
+            elevenlabs_config = self.config["elevenlabs"]
+            return elevenlabs_config.get("model"), elevenlabs_config.get(
+                "voice_settings"
+            )
+        if self.tts_provider == "azure":
+            return None, {
+                "detect_language": self.config["azure"]
+                .get("tts", {})
+                .get("detect_language")
+            }
+        if self.tts_provider == "edge_tts":
+            return None, None
+        return "tts-1", None
 
-    def _play_with_azure(self, text):
+    def _synthesize_with_openai(self, text) -> tuple[np.ndarray, int] | None:
+        # raw PCM doesn't need to be decoded
+        response = self.openai.speak(
+            text, self.config["openai"].get("tts_voice"), response_format="pcm"
+        )
+        if response is None:
+            return None
+        return (
+            self.audio_player.get_audio_from_pcm(response.content),
+            OPENAI_PCM_SAMPLERATE,
+        )
+
+    def _synthesize_with_azure(self, text) -> tuple[np.ndarray, int] | None:
+        with self.__azure_synthesizer() as speech_synthesizer:
+            if speech_synthesizer is None:
+                return None
+
+            result = speech_synthesizer.speak_text_async(text).get()
+        if result is None or not result.audio_data:
+            return None
+        return (
+            self.audio_player.get_audio_from_pcm(result.audio_data),
+            AZURE_PCM_SAMPLERATE,
+        )
+
+    def __connect_idle_azure_synthesizer(self):
+        """Connects a synthesizer and puts it into the pool, so the first response doesn't wait for it."""
+        with self.__azure_synthesizer():
+            pass
+
+    @contextmanager
+    def __azure_synthesizer(self) -> Iterator[speechsdk.SpeechSynthesizer | None]:
+        """Lends an idle synthesizer for the configured voice, with its connection already open, or None if Azure TTS isn't configured.
+
+        Synthesizers are kept after use and only recreated if the config changes, so a response doesn't wait for the connection setup.
+        A new one is only connected if all others are busy.
+        """
         azure_config = self.config["azure"].get("tts", None)
 
         if azure_config is None:
+            yield None
             return
 
+        config_hash = json.dumps(
+            [self.azure_keys["tts"], azure_config], sort_keys=True, default=str
+        )
+        synthesizer = None
+        with self.azure_lock:
+            while self.azure_synthesizers:
+                idle = self.azure_synthesizers.pop()
+                if idle[0] == config_hash:
+                    synthesizer = idle
+                    break
+                # the config changed
+                idle[2].close()
+
+        if synthesizer is None:
+            synthesizer = self.__connect_azure_synthesizer(azure_config, config_hash)
+
+        try:
+            yield synthesizer[1]
+        finally:
+            with self.azure_lock:
+                self.azure_synthesizers.append(synthesizer)
+
+    def __connect_azure_synthesizer(
+        self, azure_config: dict, config_hash: str
+    ) -> tuple[str, speechsdk.SpeechSynthesizer, speechsdk.Connection]:
+        start = time.perf_counter()
         speech_config = speechsdk.SpeechConfig(
             subscription=self.azure_keys["tts"],
             region=azure_config["region"],
         )
         speech_config.speech_synthesis_voice_name = azure_config["voice"]
+        # raw PCM doesn't need to be decoded
+        speech_config.set_speech_synthesis_output_format(
+            speechsdk.SpeechSynthesisOutputFormat.Raw24Khz16BitMonoPcm
+        )
 
         if azure_config["detect_language"]:
             auto_detect_source_language_config = (
@@ -542,32 +1035,93 @@ class OpenAiWingman(Wingman):
             if azure_config["detect_language"]
             else None,
         )
+        # connect now instead of with the first response
+        connection = speechsdk.Connection.from_speech_synthesizer(speech_synthesizer)
+        connection.open(True)
 
-        result = speech_synthesizer.speak_text_async(text).get()
-        if result is not None:
-            self.audio_player.stream_with_effects(result.audio_data, self.config)
-
-    async def _play_with_edge_tts(self, text: str):
-        edge_config = self.config["edge_tts"]
-
-        tts_voice = edge_config.get("tts_voice")
-        detect_language = edge_config.get("detect_language")
-        if detect_language:
-            gender = edge_config.get("gender")
-            tts_voice = await self.edge_tts.get_same_random_voice_for_language(
-                gender, self.last_transcript_locale
+        if self.debug:
+            printr.print(
+                f"   Connected to Azure TTS in {(time.perf_counter() - start) * 1000:.0f}ms, reusing the connection for the next responses",
+                tags="info",
             )
+        return config_hash, speech_synthesizer, connection
+
+    async def _synthesize_with_edge_tts(
+        self, text: str, voice: str
+    ) -> tuple[np.ndarray, int] | None:
+        # in memory, so several sentences can be synthesized at the same time
+        chunks = []
+        sample_rate = None
+        async for chunk, sample_rate in self.edge_tts.stream_speech(text, voice=voice):
+            chunks.append(chunk)
+        if not chunks:
+            return None
+        return np.concatenate(chunks), sample_rate
 
-        communicate, output_file = await self.edge_tts.generate_speech(
-            text, voice=tts_voice
+    def _synthesize_with_elevenlabs(self, text: str) -> tuple[np.ndarray, int] | None:
+        voice, generation_options = self.__get_elevenlabs_voice()
+        audio_bytes, _history_id = voice.generate_audio_v2(
+            prompt=text,
+            generationOptions=generation_options,
         )
-        audio, sample_rate = self.audio_player.get_audio_from_file(output_file)
-
-        self.audio_player.stream_with_effects((audio, sample_rate), self.config)
+        if not audio_bytes:
+            return None
+        return self.audio_player.get_audio_from_bytes(audio_bytes)
 
     def _play_with_elevenlabs(self, text: str):
+        voice, generation_options = self.__get_elevenlabs_voice()
+
+        # todo: add start/end callbacks to play Quindar beep even if use_sound_effects is disabled
+        playback_options = PlaybackOptions(runInBackground=True)
+        voice.generate_stream_audio_v2(
+            prompt=text,
+            playbackOptions=playback_options,
+            generationOptions=generation_options,
+        )
+
+    def __get_elevenlabs_voice(
+        self,
+    ) -> tuple[
+        ElevenLabsVoice
+        | ElevenLabsDesignedVoice
+        | ElevenLabsClonedVoice
+        | ElevenLabsProfessionalVoice,
+        GenerationOptions,
+    ]:
+        """Returns the configured voice and generation options.
+
+        Creating the user and resolving the voice are API calls, so they are only done once (in the background after prepare) and again if the config changes.
+        """
         # presence already validated in validate()
         elevenlabs_config = self.config["elevenlabs"]
+        config_hash = json.dumps(
+            [self.elevenlabs_api_key, elevenlabs_config], sort_keys=True, default=str
+        )
+        with self.elevenlabs_lock:
+            if self.elevenlabs_voice and self.elevenlabs_voice[0] == config_hash:
+                return self.elevenlabs_voice[1], self.elevenlabs_voice[2]
+
+            start = time.perf_counter()
+            voice, generation_options = self.__create_elevenlabs_voice(
+                elevenlabs_config
+            )
+            self.elevenlabs_voice = (config_hash, voice, generation_options)
+            if self.debug:
+                printr.print(
+                    f"   Loaded the ElevenLabs voice in {(time.perf_counter() - start) * 1000:.0f}ms, reusing it for every response",
+                    tags="info",
+                )
+            return voice, generation_options
+
+    def __create_elevenlabs_voice(
+        self, elevenlabs_config: dict
+    ) -> tuple[
+        ElevenLabsVoice
+        | ElevenLabsDesignedVoice
+        | ElevenLabsClonedVoice
+        | ElevenLabsProfessionalVoice,
+        GenerationOptions,
+    ]:
         # validate() already checked that either id or name is set
         voice_id = elevenlabs_config["voice"].get("id")
         voice_name = elevenlabs_config["voice"].get("name")
@@ -587,8 +1141,6 @@ class OpenAiWingman(Wingman):
         else:
             voice = user.get_voices_by_name(voice_name)[0]
 
-        # todo: add start/end callbacks to play Quindar beep even if use_sound_effects is disabled
-        playback_options = PlaybackOptions(runInBackground=True)
         generation_options = GenerationOptions(
             model=model,
             latencyOptimizationLevel=elevenlabs_config.get("latency", 0),
@@ -607,20 +1159,7 @@ class OpenAiWingman(Wingman):
         if style is not None and model != "eleven_turbo_v2":
             generation_options.style = style
 
-        use_sound_effects = elevenlabs_config.get("use_sound_effects", False)
-        if use_sound_effects:
-            audio_bytes, _history_id = voice.generate_audio_v2(
-                prompt=text,
-                generationOptions=generation_options,
-            )
-            if audio_bytes:
-                self.audio_player.stream_with_effects(audio_bytes, self.config)
-        else:
-            voice.generate_stream_audio_v2(
-                prompt=text,
-                playbackOptions=playback_options,
-                generationOptions=generation_options,
-            )
+        return voice, generation_options
 
     def _execute_command(self, command: dict) -> str:
         """Does what Wingman base does, but always returns "Ok" instead of a command response.
@@ -675,7 +1214,7 @@ class OpenAiWingman(Wingman):
             messages=[
                 {
                     "content": """
-                        I'll say a natural language name in lowercase and you'll just return the IETF country code / locale for this language.
+                        I'll say a natural language name (or its ISO 639-1 code) in lowercase and you'll just return the IETF country code / locale for this language.
                         Your answer always has exactly 2 lowercase letters, a dash, then two more letters in uppercase.
                         If I say "german", you answer with "de-DE". If I say "russian", you answer with "ru-RU".
                         If it's ambiguous and you don't know which locale to pick ("en-GB" vs "en-US"), you pick the most commonly used one.
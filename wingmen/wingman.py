@@ -1,12 +1,18 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import random
+import threading
 import time
 from difflib import SequenceMatcher
 from importlib import import_module
-from typing import Any
+from typing import Any, BinaryIO
+import numpy as np
 from services.audio_player import AudioPlayer
 from services.file_creator import FileCreator
 from services.printr import Printr
 from services.secret_keeper import SecretKeeper
+from services.streaming_transcription import StreamingTranscription
+from services.tts_cache import TtsCache
 
 # see execute_keypress() method
 printr = Printr()
@@ -53,7 +59,7 @@ class Wingman(FileCreator):
         self.name = name
         """The name of the wingman. This is the key you gave it in the config, e.g. "atc"."""
 
-        self.audio_player = AudioPlayer()
+        self.audio_player = AudioPlayer(source=name)
         """A service that allows you to play audio files and add sound effects to them."""
 
         self.execution_start: None | float = None
@@ -68,6 +74,11 @@ class Wingman(FileCreator):
         self.app_root_dir = app_root_dir
         """The path to the root directory of the app. This is where the Wingman executable lives."""
 
+        self.tts_cache: TtsCache | None = None
+        """Keeps synthesized speech on disk, so that repeated phrases don't have to be synthesized again. None if disabled in the config."""
+        if self.config["features"].get("tts_cache", True):
+            self.tts_cache = TtsCache(app_root_dir)
+
     @staticmethod
     def create_dynamically(
         module_path: str,
@@ -135,8 +146,106 @@ class Wingman(FileCreator):
         """This method is called only once when the Wingman is instantiated by Tower.
         It is run AFTER validate() so you can access validated params safely here.
 
-        You can override it if you need to load async data from an API or file."""
-        pass
+        You can override it if you need to load async data from an API or file. Call super().prepare() to keep the sound effects precompiled
+        and to pre-synthesize the command responses."""
+        self.audio_player.get_effect_chains(self.config).prepare()
+
+        if self.tts_cache and self.config["features"].get(
+            "presynthesize_responses", False
+        ):
+            self.start_presynthesis()
+
+    def start_presynthesis(self) -> threading.Thread | None:
+        """Synthesizes all command responses into the TTS cache in the background, so that they play instantly when they're used the first time.
+        Already cached responses are skipped. This doesn't block, progress is printed to the GUI.
+
+        Returns:
+            threading.Thread | None: The background thread or None if there is nothing to synthesize.
+        """
+        texts = self._get_presynthesis_texts()
+        if not texts:
+            return None
+
+        thread = threading.Thread(
+            target=self.__presynthesize,
+            args=(texts,),
+            name=f"presynthesis-{self.name}",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def _get_presynthesis_texts(self) -> list[str]:
+        """Returns the texts start_presynthesis() synthesizes: all responses of all commands (without duplicates)."""
+        return self._get_command_responses()
+
+    def _get_command_responses(self) -> list[str]:
+        """Returns the configured responses of all commands (without duplicates). These are the only fixed phrases, so the only ones worth caching."""
+        texts = []
+        for command in self.config.get("commands", []):
+            for response in command.get("responses") or []:
+                if response and response not in texts:
+                    texts.append(response)
+        return texts
+
+    def __presynthesize(self, texts: list[str]):
+        concurrency = self.config["features"].get("presynthesis_concurrency", 2)
+        start = time.perf_counter()
+        printr.print(
+            f"{self.name}: Pre-synthesizing {len(texts)} command responses...",
+            tags="info",
+        )
+
+        synthesized = 0
+        failed = 0
+        first_error = None
+        with ThreadPoolExecutor(
+            max_workers=max(1, concurrency),
+            thread_name_prefix=f"presynthesis-{self.name}",
+        ) as executor:
+            futures = [
+                # each worker runs its own event loop, so async providers don't block each other
+                executor.submit(asyncio.run, self._synthesize(text, prefetch=True))
+                for text in texts
+            ]
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    if future.result() is not None:
+                        synthesized += 1
+                    else:
+                        failed += 1
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    failed += 1
+                    first_error = first_error or e
+                    if self.debug:
+                        printr.print_warn(f"{self.name}: Pre-synthesis failed: {e}")
+                if self.debug:
+                    printr.print(
+                        f"   {self.name}: Pre-synthesized {done}/{len(texts)} responses",
+                        tags="info",
+                    )
+
+        duration = time.perf_counter() - start
+        if failed:
+            # also without debug mode, otherwise the user wonders why the responses aren't instant
+            printr.print_warn(
+                f"{self.name}: Pre-synthesized {synthesized}/{len(texts)} command responses, {failed} failed ({duration:.1f}s)."
+                + (f" First error: {first_error}" if first_error else "")
+            )
+        else:
+            printr.print(
+                f"{self.name}: {synthesized}/{len(texts)} command responses are ready ({duration:.1f}s).",
+                tags="info",
+            )
+
+    def start_streaming_transcription(self) -> StreamingTranscription | None:
+        """Called when the user starts talking. If you return a StreamingTranscription here, the recording is cut into segments at speech pauses
+        and each segment is transcribed in the background while the user is still talking. process() then receives the StreamingTranscription instead of the recording.
+
+        Returns:
+            StreamingTranscription | None: The transcription to feed the segments to or None if your Wingman doesn't support this.
+        """
+        return None
 
     def reset_conversation_history(self):
         """This function is called when the user triggers the ResetConversationHistory command.
@@ -145,7 +254,9 @@ class Wingman(FileCreator):
 
     # ──────────────────────────── The main processing loop ──────────────────────────── #
 
-    async def process(self, audio_input_wav: str):
+    async def process(
+        self, audio_input_wav: str | BinaryIO | StreamingTranscription
+    ):
         """The main method that gets called when the wingman is activated. This method controls what your wingman actually does and you can override it if you want to.
 
         The base implementation here triggers the transcription and processing of the given audio input.
@@ -154,7 +265,7 @@ class Wingman(FileCreator):
         Async so you can do async processing, e.g. send a request to an API.
 
         Args:
-            audio_input_wav (str): The path to the audio file that contains the user's speech. This is a recording of what you you said.
+            audio_input_wav (str | BinaryIO | StreamingTranscription): The in-memory audio file (or the path to an audio file) that contains the user's speech. This is a recording of what you you said. If your Wingman supports start_streaming_transcription(), this may be the already running transcription instead.
 
         Hooks:
             - async _transcribe: transcribe the audio to text
@@ -196,18 +307,39 @@ class Wingman(FileCreator):
             printr.print("Playing response back to user...", tags="info")
 
         # the last step in the chain. You'll probably want to play the response to the user as audio using a TTS provider or mechanism of your choice.
-        await self._play_to_user(str(process_result))
+        # only fixed phrases (command responses) are cached, not what the AI says
+        await self._play_to_user(
+            str(process_result),
+            cacheable=process_result in self._get_command_responses(),
+        )
 
         if self.debug:
             self.print_execution_time()
 
     # ───────────────── virtual methods / hooks ───────────────── #
 
-    async def _transcribe(self, audio_input_wav: str) -> tuple[str | None, str | None]:
+    async def _synthesize(
+        self, text: str, prefetch: bool = False, cacheable: bool = True
+    ) -> tuple[np.ndarray, int] | None:
+        """Converts text to speech without playing it. Override this if your Wingman has a TTS provider, so that its command responses can be pre-synthesized.
+
+        Args:
+            text (str): The text to synthesize.
+            prefetch (bool): True if the audio is synthesized ahead of time (to be cached) and not played now.
+            cacheable (bool): False if the text is unlikely to be said again (e.g. an AI response), so it isn't cached.
+
+        Returns:
+            tuple[np.ndarray, int] | None: The audio and its sample rate or None if not supported.
+        """
+        return None
+
+    async def _transcribe(
+        self, audio_input_wav: str | BinaryIO | StreamingTranscription
+    ) -> tuple[str | None, str | None]:
         """Transcribes the audio to text. You can override this method if you want to use a different transcription service.
 
         Args:
-            audio_input_wav (str): The path to the audio file that contains the user's speech. This is a recording of what you you said.
+            audio_input_wav (str | BinaryIO | StreamingTranscription): The in-memory audio file (or the path to an audio file) that contains the user's speech. This is a recording of what you you said. Or the StreamingTranscription you returned in start_streaming_transcription().
 
         Returns:
             tuple[str | None, str | None]: The transcript of the audio file and the detected language as locale (if determined).
@@ -230,11 +362,12 @@ class Wingman(FileCreator):
         """
         return ("", "")
 
-    async def _play_to_user(self, text: str):
+    async def _play_to_user(self, text: str, cacheable: bool = False):
         """You'll probably want to play the response to the user as audio using a TTS provider or mechanism of your choice.
 
         Args:
             text (str): The response of your _get_response_for_transcript. This is usually the "response" from conversation with the AI.
+            cacheable (bool): True if the text is a fixed phrase (e.g. a command response) that is worth caching.
         """
         pass
 